@@ -0,0 +1,256 @@
+"""
+processing.py 로컬 벤치마크.
+merge_data와 같은 스키마(common/schema.py)의 합성 게시글 / 댓글을 원하는 규모로 만들고,
+processing.py와 같은 변환(transform 패키지 CLI)을 local[*] Spark에서 로컬 경로(--input-root file://...)로 실행한 뒤
+Spark REST API(/api/v1)에서 stage별 시간 · 셔플 · 메모리 지표를 모아 출력합니다.
+클러스터 / S3 없이 UDF나 join 변경으로 인한 성능 저하를 배포 전에 확인하는 용도입니다.
+
+    # 게시글 10만 건 생성 후 실행, 결과를 JSON으로 저장
+    python benchmark_processing.py --posts 100000 --output bench-before.json
+    # 같은 데이터로 다시 실행하고 이전 결과와 비교
+    python benchmark_processing.py --skip-generate --baseline bench-before.json
+"""
+import argparse
+import json
+import os
+import random
+import resource
+import shutil
+import sys
+import time
+import urllib.request
+from datetime import datetime
+
+import pyarrow.parquet as pq
+from pyspark.sql import SparkSession
+
+from transform.cli import main as run_transform
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+# 공통 스키마는 Lambda 패키지와 같은 AWS/common/schema.py를 사용
+sys.path.append(os.path.join(HERE, "..", "common"))
+from schema import COMMENT_SCHEMA, CONTENT_SCHEMA, rows_to_table  # noqa: E402
+
+# processing.py와 함께 spark-submit --py-files로 전달하는 모듈 (Python 워커에서 import)
+PY_FILES = ("popularity.py", "text_match.py", "lexicon.py", "trends.py")
+
+SITES = ("clien", "fmkorea", "bobae", "dcinside")
+MODELS = ("palisade", "santafe", "sorento", "carnival")
+FILLER = ("오늘", "차", "생각", "그냥", "진짜", "이번", "타보니", "느낌", "아무래도", "요즘", "사람들", "가족",
+          "출퇴근", "주말", "고민", "시승", "옵션", "트림", "계약", "출고", "대기", "후기", "질문", "비교", "것",
+          "좀", "많이", "조금", "다들", "어떤가요", "했는데", "같아요", "보니까", "있어서", "하는")
+CHUNK_ROWS = 50000
+
+
+def random_word(rng):
+    """2~3음절 임의 한글 단어 (사전에 없는 토큰 → 오토마톤이 매칭 없이 지나가는 부분)"""
+    return "".join(chr(rng.randint(0xAC00, 0xD7A3)) for _ in range(rng.randint(2, 3)))
+
+
+class TextGenerator:
+    """키워드 / 감성 단어를 지정한 비율로 섞은 한국어 문장 생성"""
+
+    def __init__(self, lexicon, keyword_density, sentiment_density, seed):
+        self.rng = random.Random(seed)
+        self.keywords = [kw for smalls in lexicon["categories"].values() for kws in smalls.values() for kw in kws]
+        self.sentiment_words = lexicon["sentiment"]["positive"] + lexicon["sentiment"]["negative"]
+        self.keyword_density = keyword_density
+        self.sentiment_density = sentiment_density
+
+    def token(self):
+        roll = self.rng.random()
+        if roll < self.keyword_density:
+            return self.rng.choice(self.keywords)
+        if roll < self.keyword_density + self.sentiment_density:
+            return self.rng.choice(self.sentiment_words)
+        return self.rng.choice(FILLER) if self.rng.random() < 0.7 else random_word(self.rng)
+
+    def text(self, min_tokens, max_tokens):
+        """토큰 수를 min~max에서 고르고, 8~15 토큰마다 문장 부호로 문장을 나눔"""
+        tokens = []
+        next_boundary = self.rng.randint(8, 15)
+        for index in range(self.rng.randint(min_tokens, max_tokens)):
+            tokens.append(self.token())
+            if index + 1 == next_boundary:
+                tokens[-1] += self.rng.choice((".", "!", "?", "..."))
+                next_boundary += self.rng.randint(8, 15)
+        return " ".join(tokens)
+
+
+def generate(data_dir, day, posts, comments_per_post, keyword_density, sentiment_density, seed):
+    """data_dir/merge_data/{contents,comments}/{day}.parquet과 jobs/ 설정 파일 생성"""
+    with open(os.path.join(HERE, "lexicon", "v1.json"), encoding="utf-8") as f:
+        lexicon = json.load(f)
+    generator = TextGenerator(lexicon, keyword_density, sentiment_density, seed)
+    rng = generator.rng
+
+    for sub in ("merge_data/contents", "merge_data/comments", "jobs/config", "jobs/lexicon"):
+        os.makedirs(os.path.join(data_dir, sub), exist_ok=True)
+    shutil.copy(os.path.join(HERE, "config", "popularity.json"), os.path.join(data_dir, "jobs", "config"))
+    shutil.copy(os.path.join(HERE, "lexicon", "v1.json"), os.path.join(data_dir, "jobs", "lexicon"))
+
+    content_path = os.path.join(data_dir, "merge_data", "contents", f"{day}.parquet")
+    comment_path = os.path.join(data_dir, "merge_data", "comments", f"{day}.parquet")
+    started = time.time()
+    comment_rows_total = 0
+    with pq.ParquetWriter(content_path, CONTENT_SCHEMA) as content_writer, \
+            pq.ParquetWriter(comment_path, COMMENT_SCHEMA) as comment_writer:
+        for chunk_start in range(0, posts, CHUNK_ROWS):
+            content_rows, comment_rows = [], []
+            for index in range(chunk_start, min(posts, chunk_start + CHUNK_ROWS)):
+                url = f"https://bench.local/post/{index}"
+                title = generator.text(3, 10)
+                views = int(rng.lognormvariate(5, 1.5))
+                comments_count = min(int(rng.expovariate(1 / comments_per_post)) if comments_per_post else 0, 200)
+                content_rows.append({
+                    "site": rng.choice(SITES), "datetime": f"{day} {rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:00",
+                    "model": rng.choice(MODELS), "title": title, "content": generator.text(30, 200), "url": url,
+                    "author": f"user{rng.randint(1, 50000)}", "likes": int(views * rng.random() * 0.05),
+                    "hates": 0, "comments_count": comments_count, "views": views,
+                })
+                comment_rows.extend({"url": url, "title": title, "comment": generator.text(3, 25)}
+                                    for _ in range(comments_count))
+            content_writer.write_table(rows_to_table(content_rows, CONTENT_SCHEMA))
+            if comment_rows:
+                comment_writer.write_table(rows_to_table(comment_rows, COMMENT_SCHEMA))
+            comment_rows_total += len(comment_rows)
+            print(f"  생성 {min(posts, chunk_start + CHUNK_ROWS):,}/{posts:,}", end="\r")
+
+    print(f"✅ 합성 데이터: 게시글 {posts:,}건, 댓글 {comment_rows_total:,}건 ({time.time() - started:.1f}초)")
+    print(f"   본문 {os.path.getsize(content_path) / 1e6:.1f}MB, 댓글 {os.path.getsize(comment_path) / 1e6:.1f}MB")
+
+
+def rest(spark, endpoint):
+    url = f"{spark.sparkContext.uiWebUrl}/api/v1/applications/{spark.sparkContext.applicationId}/{endpoint}"
+    with urllib.request.urlopen(url, timeout=10) as response:
+        return json.loads(response.read().decode("utf-8"))
+
+
+def parse_time(value):
+    return datetime.strptime(value.replace("GMT", ""), "%Y-%m-%dT%H:%M:%S.%f") if value else None
+
+
+def collect_metrics(spark):
+    """완료된 stage 지표를 호출 위치(transform/*.py:줄 번호)별로 합산, executor 최대 메모리"""
+    # 리스너 이벤트가 UI 저장소에 반영될 때까지 대기
+    for _ in range(50):
+        if not rest(spark, "stages?status=active"):
+            break
+        time.sleep(0.2)
+
+    stages = {}
+    for stage in rest(spark, "stages?status=complete"):
+        started, completed = parse_time(stage.get("submissionTime")), parse_time(stage.get("completionTime"))
+        callsite = stage["name"]
+        entry = stages.setdefault(callsite, {"stages": 0, "wall_ms": 0, "executor_run_ms": 0, "tasks": 0,
+                                             "input_bytes": 0, "shuffle_read_bytes": 0, "shuffle_write_bytes": 0,
+                                             "spill_bytes": 0, "peak_execution_memory": 0})
+        entry["stages"] += 1
+        entry["wall_ms"] += int((completed - started).total_seconds() * 1000) if started and completed else 0
+        entry["executor_run_ms"] += stage.get("executorRunTime", 0)
+        entry["tasks"] += stage.get("numCompleteTasks", 0)
+        entry["input_bytes"] += stage.get("inputBytes", 0)
+        entry["shuffle_read_bytes"] += stage.get("shuffleReadBytes", 0)
+        entry["shuffle_write_bytes"] += stage.get("shuffleWriteBytes", 0)
+        entry["spill_bytes"] += stage.get("memoryBytesSpilled", 0) + stage.get("diskBytesSpilled", 0)
+        entry["peak_execution_memory"] = max(entry["peak_execution_memory"], stage.get("peakExecutionMemory", 0))
+
+    memory = {}
+    for executor in rest(spark, "allexecutors"):
+        for metric, value in (executor.get("peakMemoryMetrics") or {}).items():
+            memory[metric] = max(memory.get(metric, 0), value)
+    # 드라이버 Python 프로세스 최대 RSS (Linux: KB)
+    memory["DriverPythonMaxRSS"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return stages, memory
+
+
+def run(data_dir, day, master, shuffle_partitions, driver_memory):
+    """processing.py와 같은 변환을 local Spark에서 실행하고 (전체 시간, stage 지표, 메모리 지표)를 반환"""
+    builder = SparkSession.builder.master(master).appName("TransformBenchmark") \
+        .config("spark.driver.memory", driver_memory) \
+        .config("spark.ui.enabled", "true") \
+        .config("spark.executor.processTreeMetrics.enabled", "true") \
+        .config("spark.executor.metrics.pollingInterval", "500ms")
+    if shuffle_partitions:
+        builder = builder.config("spark.sql.shuffle.partitions", shuffle_partitions)
+    spark = builder.getOrCreate()
+    for name in PY_FILES:
+        spark.sparkContext.addPyFile(os.path.join(HERE, name))
+
+    started = time.time()
+    # transform CLI는 SparkSession.builder.getOrCreate()로 위 세션을 그대로 사용
+    run_transform(["--start", day, "--input-root", "file://" + os.path.abspath(data_dir) + "/"])
+    elapsed = time.time() - started
+
+    stages, memory = collect_metrics(spark)
+    spark.stop()
+    return elapsed, stages, memory
+
+
+def human(value):
+    for unit in ("B", "KB", "MB", "GB"):
+        if abs(value) < 1024 or unit == "GB":
+            return f"{value:.0f}{unit}" if unit == "B" else f"{value:.1f}{unit}"
+        value /= 1024
+
+
+def report(elapsed, stages, memory, baseline=None):
+    base_stages = (baseline or {}).get("stages", {})
+    print(f"\n⏱️ 전체 {elapsed:.1f}초" + (f" (기준 {baseline['elapsed']:.1f}초)" if baseline else ""))
+    print(f"{'호출 위치':<48} {'stage':>5} {'wall':>8} {'task 합':>8} {'셔플 R':>9} {'셔플 W':>9} {'spill':>9} {'peak':>9}")
+    for callsite, entry in sorted(stages.items(), key=lambda item: -item[1]["wall_ms"]):
+        line = (f"{callsite[:48]:<48} {entry['stages']:>5} {entry['wall_ms'] / 1000:>7.1f}s "
+                f"{entry['executor_run_ms'] / 1000:>7.1f}s {human(entry['shuffle_read_bytes']):>9} "
+                f"{human(entry['shuffle_write_bytes']):>9} {human(entry['spill_bytes']):>9} "
+                f"{human(entry['peak_execution_memory']):>9}")
+        if callsite in base_stages and base_stages[callsite]["wall_ms"]:
+            change = entry["wall_ms"] / base_stages[callsite]["wall_ms"] - 1
+            line += f"  {change:+.0%}" + (" ⚠️" if change > 0.2 else "")
+        print(line)
+    total_shuffle = sum(entry["shuffle_write_bytes"] for entry in stages.values())
+    print(f"\n🔀 셔플 쓰기 합계 {human(total_shuffle)}"
+          + (f" (기준 {human(baseline['shuffle_write_bytes'])})" if baseline else ""))
+    print("🧠 최대 메모리: " + ", ".join(f"{metric} {human(value)}" for metric, value in sorted(memory.items())
+                                       if metric in ("JVMHeapMemory", "ProcessTreePythonRSSMemory",
+                                                     "ProcessTreeJVMRSSMemory", "DriverPythonMaxRSS")))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="processing.py 로컬 벤치마크")
+    parser.add_argument("--data-dir", default="bench_data", help="합성 데이터 / 결과를 둘 로컬 디렉터리")
+    parser.add_argument("--posts", type=int, default=10000, help="게시글 수 (1만 ~ 1000만)")
+    parser.add_argument("--comments-per-post", type=float, default=3.0, help="게시글당 평균 댓글 수")
+    parser.add_argument("--keyword-density", type=float, default=0.03, help="토큰 중 사전 키워드 비율")
+    parser.add_argument("--sentiment-density", type=float, default=0.03, help="토큰 중 감성 단어 비율")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-generate", action="store_true", help="이미 만든 --data-dir 데이터로 실행")
+    parser.add_argument("--master", default="local[*]")
+    parser.add_argument("--driver-memory", default="4g")
+    parser.add_argument("--shuffle-partitions", help="spark.sql.shuffle.partitions (기본값: Spark 기본)")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    parser.add_argument("--baseline", help="비교할 이전 결과 JSON")
+    args = parser.parse_args()
+
+    # 생성한 날짜(오늘)의 merge_data로 실행 (--skip-generate는 같은 날 만든 데이터에 사용)
+    day = datetime.now().strftime("%Y-%m-%d")
+    if not args.skip_generate:
+        generate(args.data_dir, day, args.posts, args.comments_per_post,
+                 args.keyword_density, args.sentiment_density, args.seed)
+
+    elapsed, stages, memory = run(args.data_dir, day, args.master, args.shuffle_partitions, args.driver_memory)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+    report(elapsed, stages, memory, baseline)
+
+    if args.output:
+        result = {"posts": args.posts, "elapsed": elapsed, "stages": stages, "memory": memory,
+                  "shuffle_write_bytes": sum(entry["shuffle_write_bytes"] for entry in stages.values())}
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"✅ 결과 저장: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,4 @@
+#!/bin/bash
+# EMR 부트스트랩: pandas UDF(Arrow) 실행에 필요한 패키지와 Aho–Corasick C 구현 설치
+set -e
+sudo python3 -m pip install pandas pyarrow pyahocorasick
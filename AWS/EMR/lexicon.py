@@ -0,0 +1,106 @@
+"""
+키워드 · 카테고리 · 감성 단어 사전(lexicon).
+버전별 JSON 파일(lexicon/{version}.json, S3 jobs/lexicon/)로 관리하며, 로드 시 검증한 뒤
+Spark 작업에서 쓰는 형태(키워드 → 소분류 / 대분류 DataFrame, 매칭용 키워드 · 감성 단어 목록)로 변환합니다.
+사전을 바꿀 때는 새 버전 파일을 올리고 LEXICON_VERSION만 바꾸면 되므로 Spark 작업을 다시 배포할 필요가 없습니다.
+
+{
+  "version": "v1",
+  "categories": {"디자인": {"외관": ["외관", "전면", ...], "내관": [...]}, ...},   # 대분류 → 소분류 → 키워드
+  "sentiment": {"positive": [...], "negative": [...]}
+}
+키워드를 소분류 아래에 직접 나열하므로 키워드 / 카테고리 병렬 배열이 어긋날 수 없습니다.
+"""
+import hashlib
+import json
+from text_match import SENTIMENTS, get_matcher
+
+
+class LexiconError(ValueError):
+    """사전 파일 형식 / 내용 오류 (모든 문제를 모아 한 번에 보고)"""
+
+
+class Lexicon:
+    def __init__(self, data):
+        validate(data)
+        self.version = data["version"]
+        self.categories = data["categories"]
+        self.sentiment = {polarity: list(data["sentiment"][polarity]) for polarity in SENTIMENTS}
+        # 키워드 → (소분류, 대분류)
+        self.keyword_categories = {
+            keyword: (small, large)
+            for large, smalls in self.categories.items()
+            for small, keywords in smalls.items()
+            for keyword in keywords
+        }
+        self.keywords = list(self.keyword_categories)
+        # 실행기 캐시 키: 버전 + 내용 해시 (같은 버전 이름으로 내용이 바뀌어도 다른 오토마톤을 사용)
+        digest = hashlib.sha1(json.dumps(data, ensure_ascii=False, sort_keys=True).encode("utf-8")).hexdigest()
+        self.key = f"{self.version}-{digest[:12]}"
+
+    def keyword_frame(self, spark):
+        """(keyword, small_category, large_category) DataFrame (broadcast join용 작은 테이블)"""
+        rows = [(keyword, small, large) for keyword, (small, large) in self.keyword_categories.items()]
+        return spark.createDataFrame(rows, schema="keyword string, small_category string, large_category string")
+
+    def compile(self):
+        """매칭 오토마톤을 만들어 반환 (드라이버에서 호출하면 작업 시작 전에 사전 오류를 확인할 수 있음)"""
+        return get_matcher(self.keywords, self.sentiment, key=self.key)
+
+
+def validate(data):
+    """형식 · 빈 단어 · 중복 키워드 · 긍정/부정 중복 등을 검사하고, 문제가 있으면 LexiconError"""
+    problems = []
+    if not isinstance(data.get("version"), str) or not data["version"]:
+        problems.append("version이 없음")
+    categories = data.get("categories")
+    if not isinstance(categories, dict) or not categories:
+        problems.append("categories가 비어 있음")
+        categories = {}
+
+    seen = {}
+    for large, smalls in categories.items():
+        if not isinstance(smalls, dict) or not smalls:
+            problems.append(f"대분류 '{large}'에 소분류가 없음")
+            continue
+        for small, keywords in smalls.items():
+            if not isinstance(keywords, list) or not keywords:
+                problems.append(f"소분류 '{large}/{small}'에 키워드가 없음")
+                continue
+            for keyword in keywords:
+                if not isinstance(keyword, str) or not keyword.strip():
+                    problems.append(f"소분류 '{large}/{small}'에 빈 키워드")
+                elif keyword in seen:
+                    problems.append(f"키워드 '{keyword}' 중복 ({seen[keyword]}, {large}/{small})")
+                else:
+                    seen[keyword] = f"{large}/{small}"
+
+    sentiment = data.get("sentiment")
+    if not isinstance(sentiment, dict):
+        problems.append("sentiment가 없음")
+        sentiment = {}
+    words = {}
+    for polarity in SENTIMENTS:
+        entries = sentiment.get(polarity)
+        if not isinstance(entries, list) or not entries:
+            problems.append(f"sentiment.{polarity}가 비어 있음")
+            continue
+        for word in entries:
+            if not isinstance(word, str) or not word.strip():
+                problems.append(f"sentiment.{polarity}에 빈 단어")
+            elif word in words:
+                problems.append(f"감성 단어 '{word}' 중복 ({words[word]}, {polarity})")
+            else:
+                words[word] = polarity
+
+    if problems:
+        raise LexiconError("사전 검증 실패:\n- " + "\n- ".join(problems))
+
+
+def load_lexicon(spark, path):
+    """S3 / 로컬의 사전 JSON을 읽어 검증된 Lexicon을 반환 (읽기 / 검증 실패 시 예외로 작업 중단)"""
+    text = "\n".join(row.value for row in spark.read.text(path).collect())
+    lexicon = Lexicon(json.loads(text))
+    print(f"✅ 사전 로드: {path} (version {lexicon.version}, 키워드 {len(lexicon.keywords)}개, "
+          f"감성 단어 {sum(len(words) for words in lexicon.sentiment.values())}개)")
+    return lexicon
@@ -0,0 +1,232 @@
+"""
+하루 중 마이크로 배치 모드.
+processing.py는 하루 한 번 merge_data 전체로 live 결과와 알람을 계산하므로 알람이 최대 하루 늦습니다.
+이 작업은 장기 실행 EMR 클러스터에서 계속 돌며 POLL_SECONDS마다
+1. parse Lambda가 다시 쓴 raw_data/{site}/{오늘}-content.parquet / -comment.parquet(수정 시각 변경)만 읽고
+2. 이전 배치와 지표(likes / views / comments_count)가 달라진 게시글(새 게시글 포함)만 키워드 · 감성 매칭해
+3. 게시글별 기여분(state)을 바꾸고, 소분류별 누적 집계에는 차이(새 기여분 - 이전 기여분)만 더합니다.
+4. 바뀐 차종의 live_popularity / live_sentiment / live_category 파티션만 덮어쓰고,
+   화제도 기준을 처음 넘은 게시글은 바로 alarm/date=오늘/에 CSV로 추가해 Slack 알림 Lambda를 트리거합니다.
+state는 드라이버 세션에만 있으며 날짜가 바뀌거나 작업을 다시 시작하면 오늘 파일부터 다시 계산합니다.
+(이미 보낸 알람은 alarm/date=오늘/의 CSV에서 다시 읽어 중복 전송하지 않음)
+"""
+import os
+import time
+from datetime import datetime
+
+from pyspark.sql import SparkSession, functions as F
+
+from lexicon import load_lexicon
+from popularity import load_config, with_popularity
+from text_match import text_match_udf
+
+BUCKET = os.getenv("BUCKET", "hmg5th-4-bucket")
+POLL_SECONDS = int(os.getenv("POLL_SECONDS", "60"))
+MAX_BATCHES = int(os.getenv("MAX_BATCHES", "0"))  # 0이면 계속 실행
+ALARM_THRESHOLD = float(os.getenv("ALARM_THRESHOLD", "15"))
+LEXICON_VERSION = os.getenv("LEXICON_VERSION", "v1")
+
+METRICS = ("likes", "views", "comments_count")
+CATEGORY_KEYS = ("model", "large_category", "small_category")
+
+output_base = f"s3a://{BUCKET}/transformed_data/"
+
+# state 스키마
+POSTS_SCHEMA = "url string, model string, likes long, views long, comments_count long"
+CONTRIBUTIONS_SCHEMA = ("url string, model string, title string, popularity double, keyword string, "
+                        "small_category string, large_category string, keyword_positive int, keyword_negative int")
+AGGREGATES_SCHEMA = ("model string, large_category string, small_category string, "
+                     "popularity_sum double, positive_sum long, negative_sum long")
+
+
+def hadoop_fs(spark, path):
+    jvm_path = spark._jvm.org.apache.hadoop.fs.Path(path)
+    return jvm_path, jvm_path.getFileSystem(spark._jsc.hadoopConfiguration())
+
+
+def changed_files(spark, today, seen):
+    """
+    오늘 parse 결과 중 새로 생겼거나 수정 시각이 바뀐 파일을 찾아 (본문 경로, 댓글 경로) 목록으로 반환.
+    본문 / 댓글 중 하나만 바뀌어도 같은 사이트의 두 파일을 함께 읽음
+    """
+    pattern, fs = hadoop_fs(spark, f"s3a://{BUCKET}/raw_data/*/{today}-*.parquet")
+    statuses = fs.globStatus(pattern) or []
+    bases = set()
+    for status in statuses:
+        path = status.getPath().toString()
+        modified = status.getModificationTime()
+        if seen.get(path) == modified:
+            continue
+        seen[path] = modified
+        for suffix in ("content.parquet", "comment.parquet"):
+            if path.endswith("-" + suffix):
+                bases.add(path[:-len(suffix)])
+
+    existing = {status.getPath().toString() for status in statuses}
+    contents = sorted(base + "content.parquet" for base in bases if base + "content.parquet" in existing)
+    comments = sorted(base + "comment.parquet" for base in bases if base + "comment.parquet" in existing)
+    return contents, comments
+
+
+def load_posts(spark, contents, comments, popularity_config):
+    """
+    processing.py의 2~4단계와 같은 전처리 (url · model 단위 한 행, text = 제목 + 본문 + 댓글)
+    여러 차종 목록에 걸린 게시글은 일 배치처럼 차종마다 한 행씩 유지 (차종별 live 집계가 일 배치와 같도록)
+    """
+    df_contents = spark.read.parquet(*contents).drop("author", "hates") \
+        .filter(F.col("title").isNotNull() & F.col("content").isNotNull()) \
+        .fillna(0, subset=list(METRICS)) \
+        .dropDuplicates(["url", "model"])
+    df_contents = with_popularity(df_contents, spark, popularity_config)
+
+    comment_agg = F.lit("")
+    if comments:
+        df_comments = spark.read.parquet(*comments).filter(F.col("comment").isNotNull()) \
+            .groupBy("url").agg(F.concat_ws(" ", F.collect_list("comment")).alias("comment_agg"))
+        df_contents = df_contents.join(df_comments, on="url", how="left")
+        comment_agg = F.coalesce(F.col("comment_agg"), F.lit(""))
+
+    return df_contents.withColumn("text", F.concat_ws(" ", F.col("title"), F.col("content"), comment_agg)) \
+        .select("url", "model", "title", "popularity", *METRICS, "text")
+
+
+def contributions_of(df_changed, match_text_udf, df_keyword_category):
+    """바뀐 게시글 → 키워드 행별 기여분 (processing.py의 df_keywords와 같은 형태)"""
+    return df_changed.withColumn("matches", match_text_udf(F.col("text"))) \
+        .filter(F.col("matches.keywords").isNotNull()) \
+        .select("url", "model", "title", "popularity", "matches",
+                F.posexplode("matches.keywords").alias("pos", "keyword")) \
+        .withColumn("keyword_positive", F.col("matches.keyword_positive")[F.col("pos")]) \
+        .withColumn("keyword_negative", F.col("matches.keyword_negative")[F.col("pos")]) \
+        .join(F.broadcast(df_keyword_category), on="keyword", how="left") \
+        .select("url", "model", "title", "popularity", "keyword", "small_category", "large_category",
+                "keyword_positive", "keyword_negative")
+
+
+def as_delta(df_contributions, sign):
+    """기여분 → 소분류별 집계 차이 행 (sign=-1이면 이전 기여분 빼기)"""
+    return df_contributions.select(
+        *CATEGORY_KEYS,
+        (F.col("popularity") * sign).alias("popularity_sum"),
+        (F.col("keyword_positive").cast("long") * sign).alias("positive_sum"),
+        (F.col("keyword_negative").cast("long") * sign).alias("negative_sum"),
+    )
+
+
+def load_alarmed(spark, today):
+    """오늘 이미 알람을 보낸 url (작업 재시작 시 중복 전송 방지)"""
+    path = f"{output_base}alarm/date={today}"
+    jvm_path, fs = hadoop_fs(spark, path)
+    if not fs.exists(jvm_path):
+        return spark.createDataFrame([], "url string")
+    return spark.read.option("header", "true").csv(path).select("url").distinct()
+
+
+class MicroBatchState:
+    """하루 동안 유지하는 state: 파일 수정 시각, 게시글 지표, 게시글별 기여분, 소분류별 누적 집계, 알람 보낸 url"""
+
+    def __init__(self, spark, today):
+        self.today = today
+        self.seen = {}
+        self.posts = spark.createDataFrame([], POSTS_SCHEMA)
+        self.contributions = spark.createDataFrame([], CONTRIBUTIONS_SCHEMA)
+        self.aggregates = spark.createDataFrame([], AGGREGATES_SCHEMA)
+        self.alarmed = load_alarmed(spark, today).localCheckpoint()
+
+
+def write_partitions(df, name, today, models):
+    """바뀐 차종의 date / model 파티션만 덮어씀 (partitionOverwriteMode=dynamic)"""
+    df.filter(F.col("model").isin(models)) \
+        .withColumn("date", F.lit(today)) \
+        .coalesce(1) \
+        .write.mode("overwrite").partitionBy("date", "model").parquet(output_base + name)
+
+
+def run_batch(spark, state, match_text_udf, df_keyword_category, popularity_config):
+    """한 번의 마이크로 배치. 처리한 게시글 수를 반환"""
+    contents, comments = changed_files(spark, state.today, state.seen)
+    if not contents:
+        return 0
+
+    df_posts = load_posts(spark, contents, comments, popularity_config)
+    # 지표가 그대로인 게시글은 이전 결과와 같으므로 제외 (새 게시글 / 지표가 바뀐 게시글만)
+    df_changed = df_posts.join(state.posts, on=["url", "model", *METRICS], how="left_anti").localCheckpoint()
+    if df_changed.isEmpty():
+        return 0
+
+    changed_posts = df_changed.select("url", "model")
+    df_new = contributions_of(df_changed, match_text_udf, df_keyword_category).localCheckpoint()
+    df_old = state.contributions.join(changed_posts, on=["url", "model"], how="left_semi")
+
+    # 소분류별 누적 집계 += 새 기여분 - 이전 기여분
+    df_delta = as_delta(df_new, 1).unionByName(as_delta(df_old, -1))
+    state.aggregates = state.aggregates.unionByName(df_delta) \
+        .groupBy(*CATEGORY_KEYS) \
+        .agg(F.sum("popularity_sum").alias("popularity_sum"),
+             F.sum("positive_sum").alias("positive_sum"),
+             F.sum("negative_sum").alias("negative_sum")) \
+        .localCheckpoint()
+    state.contributions = state.contributions.join(changed_posts, on=["url", "model"], how="left_anti") \
+        .unionByName(df_new).localCheckpoint()
+    state.posts = state.posts.join(changed_posts, on=["url", "model"], how="left_anti") \
+        .unionByName(df_changed.select("url", "model", *METRICS)).localCheckpoint()
+
+    # 바뀐 차종의 live 결과만 다시 저장
+    models = [row.model for row in df_delta.select("model").distinct().collect() if row.model is not None]
+    if models:
+        write_partitions(state.aggregates.select(*CATEGORY_KEYS, "popularity_sum"),
+                         "live_popularity", state.today, models)
+        write_partitions(state.aggregates.select(*CATEGORY_KEYS, "positive_sum", "negative_sum"),
+                         "live_sentiment", state.today, models)
+        write_partitions(state.contributions.select("model", "url", "title", "popularity", "small_category")
+                         .dropDuplicates(["url", "small_category"]), "live_category", state.today, models)
+
+    # 화제도 기준을 처음 넘은 게시글만 알람 (게시글마다 한 번)
+    df_alarm = df_changed.filter(F.col("popularity") >= ALARM_THRESHOLD) \
+        .dropDuplicates(["url"]) \
+        .join(state.alarmed, on="url", how="left_anti") \
+        .select("title", "url", "popularity").localCheckpoint()
+    if not df_alarm.isEmpty():
+        # 기존 알람 파일은 두고 새 CSV 파일만 추가 → Slack 알림 Lambda가 새 게시글만 보고
+        df_alarm.withColumn("date", F.lit(state.today)).coalesce(1) \
+            .write.mode("append").partitionBy("date").option("header", "true").csv(output_base + "alarm")
+        state.alarmed = state.alarmed.unionByName(df_alarm.select("url")).localCheckpoint()
+        print(f"🚨 알람 {df_alarm.count()}건")
+
+    return df_changed.count()
+
+
+def main():
+    spark = SparkSession.builder.appName("TransformMicroBatch").getOrCreate()
+    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
+
+    # 사전 / 화제도 설정은 시작할 때 한 번 로드 (바꾸려면 작업 재시작)
+    lexicon = load_lexicon(spark, f"s3a://{BUCKET}/jobs/lexicon/{LEXICON_VERSION}.json")
+    lexicon.compile()
+    df_keyword_category = lexicon.keyword_frame(spark).localCheckpoint()
+    match_text_udf = text_match_udf(lexicon.keywords, lexicon.sentiment, key=lexicon.key)
+    popularity_config = load_config(spark, f"s3a://{BUCKET}/jobs/config/popularity.json")
+
+    state = None
+    batches = 0
+    while not MAX_BATCHES or batches < MAX_BATCHES:
+        today = datetime.now().strftime("%Y-%m-%d")
+        if state is None or state.today != today:
+            # 날짜가 바뀌면 state를 새로 시작 (live 결과는 날짜 파티션별)
+            state = MicroBatchState(spark, today)
+            print(f"📅 {today} 마이크로 배치 시작")
+
+        started = time.time()
+        processed = run_batch(spark, state, match_text_udf, df_keyword_category, popularity_config)
+        batches += 1
+        if processed:
+            print(f"✅ 배치 {batches}: 게시글 {processed}건 반영 ({time.time() - started:.1f}초)")
+        if MAX_BATCHES and batches >= MAX_BATCHES:
+            break
+        time.sleep(max(0.0, POLL_SECONDS - (time.time() - started)))
+
+    spark.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""
+화제도(popularity) 계산.
+사이트별 평균값 / 가중치를 작은 DataFrame으로 만들어 broadcast join하고, 점수는 Spark 내장 식으로 계산합니다.
+(Python UDF가 아니므로 행 단위 JVM ↔ Python 직렬화 없이 Catalyst / codegen이 그대로 적용됨)
+
+popularity = Σ (지표 / 사이트 평균) × 가중치   (지표: likes, views, comments_count)
+
+설정 파일(config/popularity.json)
+{
+  "version": 1,
+  "weights": {"likes": 0.4, "views": 0.2, "comments_count": 0.4},
+  "sites": {"clien": {"likes": 1.2, "views": 4500, "comments_count": 13, "weights": {...}}, ...}
+}
+- sites.{site}: 사이트별 평균값, weights가 있으면 해당 사이트만 전체 가중치를 덮어씀
+- 설정에 없는 사이트의 popularity는 0
+- 파일이 없을 때만 DEFAULT_CONFIG를 사용하고, JSON / 형식 오류는 ConfigError로 작업 중단 (잘못 고친 가중치가 조용히 무시되지 않도록)
+"""
+import json
+from pyspark.sql import functions as F, types as T
+
+METRICS = ("likes", "views", "comments_count")
+
+# 설정 파일이 없는 경우 사용하는 기본값 (기존 data_stats와 동일)
+DEFAULT_CONFIG = {
+    "version": 1,
+    "weights": {"likes": 0.4, "views": 0.2, "comments_count": 0.4},
+    "sites": {
+        "clien": {"likes": 1.2, "views": 4500, "comments_count": 13},
+        "fmkorea": {"likes": 7, "views": 180, "comments_count": 8},
+        "bobae": {"likes": 2, "views": 450, "comments_count": 6},
+        "dcinside": {"likes": 1, "views": 65, "comments_count": 4},
+    },
+}
+
+
+class ConfigError(ValueError):
+    """popularity 설정 파일 형식 / 내용 오류 (모든 문제를 모아 한 번에 보고)"""
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate(config):
+    """weights / sites의 키와 값(숫자, 평균은 0보다 큼)을 검사하고, 문제가 있으면 ConfigError"""
+    problems = []
+    if not isinstance(config, dict):
+        raise ConfigError("popularity 설정 오류:\n- 최상위가 객체가 아님")
+    unknown = set(config) - {"version", "weights", "sites"}
+    if unknown:
+        problems.append(f"알 수 없는 키: {', '.join(sorted(unknown))}")
+
+    def check_weights(weights, where, required):
+        if not isinstance(weights, dict):
+            problems.append(f"{where}가 객체가 아님")
+            return
+        for metric in set(weights) - set(METRICS):
+            problems.append(f"{where}에 알 수 없는 지표 '{metric}'")
+        for metric in METRICS:
+            if metric not in weights:
+                if required:
+                    problems.append(f"{where}에 '{metric}' 없음")
+            elif not _is_number(weights[metric]) or weights[metric] < 0:
+                problems.append(f"{where}.{metric}이 0 이상의 숫자가 아님: {weights[metric]!r}")
+
+    check_weights(config.get("weights"), "weights", required=True)
+    sites = config.get("sites")
+    if not isinstance(sites, dict) or not sites:
+        problems.append("sites가 비어 있음")
+        sites = {}
+    for site, stats in sites.items():
+        if not isinstance(stats, dict):
+            problems.append(f"sites.{site}가 객체가 아님")
+            continue
+        for key in set(stats) - set(METRICS) - {"weights"}:
+            problems.append(f"sites.{site}에 알 수 없는 키 '{key}'")
+        for metric in METRICS:
+            if not _is_number(stats.get(metric)) or stats[metric] <= 0:
+                problems.append(f"sites.{site}.{metric}(평균)이 0보다 큰 숫자가 아님: {stats.get(metric)!r}")
+        if "weights" in stats:
+            check_weights(stats["weights"], f"sites.{site}.weights", required=False)
+    if problems:
+        raise ConfigError("popularity 설정 오류:\n- " + "\n- ".join(problems))
+
+
+def _exists(spark, path):
+    jvm_path = spark._jvm.org.apache.hadoop.fs.Path(path)
+    return jvm_path.getFileSystem(spark._jsc.hadoopConfiguration()).exists(jvm_path)
+
+
+def load_config(spark, path):
+    """
+    S3 / 로컬의 JSON 설정을 읽어 검증. 파일이 없으면 DEFAULT_CONFIG
+    (JSON 파싱 / 검증 실패는 ConfigError로 작업 중단)
+    """
+    if not _exists(spark, path):
+        print(f"⚠️ popularity 설정 파일이 없어 기본값 사용: {path}")
+        return DEFAULT_CONFIG
+    text = "\n".join(row.value for row in spark.read.text(path).collect())
+    try:
+        config = json.loads(text)
+    except ValueError as e:
+        raise ConfigError(f"popularity 설정 JSON 오류 ({path}): {e}") from e
+    validate(config)
+    print(f"✅ popularity 설정 로드: {path} (version {config.get('version')})")
+    return config
+
+
+def coefficients(config):
+    """사이트별 (가중치 / 평균) 계수 → [(site, likes 계수, views 계수, comments_count 계수)]"""
+    rows = []
+    for site, stats in config["sites"].items():
+        weights = {**config["weights"], **stats.get("weights", {})}
+        rows.append((site, *(float(weights[metric]) / float(stats[metric]) for metric in METRICS)))
+    return rows
+
+
+def stats_frame(spark, config):
+    schema = T.StructType([T.StructField("site", T.StringType())] +
+                          [T.StructField(f"coef_{metric}", T.DoubleType()) for metric in METRICS])
+    return spark.createDataFrame(coefficients(config), schema=schema)
+
+
+def with_popularity(df, spark, config=DEFAULT_CONFIG):
+    """df(site, likes, views, comments_count)에 popularity 컬럼 추가"""
+    score = sum(F.col(metric).cast("double") * F.col(f"coef_{metric}") for metric in METRICS)
+    return df.join(F.broadcast(stats_frame(spark, config)), on="site", how="left") \
+        .withColumn("popularity", F.coalesce(score, F.lit(0.0))) \
+        .drop(*(f"coef_{metric}" for metric in METRICS))
@@ -0,0 +1,77 @@
+"""
+실행 계획 셔플 수 회귀 테스트.
+작은 합성 DataFrame으로 TransformJob.transform의 출력 테이블을 만들고, 테이블마다 셔플 수가 plan.EXPECTED_SHUFFLES 기준 이하인지 확인
+(코드 수정으로 셔플이 늘어나면 PLAN_CHECK 출력만이 아니라 테스트가 실패)
+
+    cd AWS/EMR && python -m pytest -q tests
+"""
+import os
+import shutil
+import sys
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip("pyspark")
+pytest.importorskip("pyarrow")
+pytest.importorskip("ahocorasick")
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+EMR = os.path.dirname(HERE)
+sys.path.insert(0, EMR)
+
+from pyspark.sql import SparkSession  # noqa: E402
+
+from transform import TransformJob  # noqa: E402
+from transform.plan import EXPECTED_SHUFFLES, count_shuffles, expected_shuffles  # noqa: E402
+
+CONTENT_DDL = ("site string, datetime timestamp, model string, title string, content string, url string, "
+               "author string, likes bigint, hates bigint, comments_count bigint, views bigint, date string")
+COMMENT_DDL = "url string, title string, comment string, date string"
+
+
+@pytest.fixture(scope="module")
+def spark():
+    try:
+        session = SparkSession.builder.master("local[1]").appName("PlanTest") \
+            .config("spark.ui.enabled", "false").getOrCreate()
+    except Exception as e:  # Java가 없는 환경 등
+        pytest.skip(f"로컬 Spark를 시작할 수 없음: {e}")
+    yield session
+    session.stop()
+
+
+@pytest.fixture(scope="module")
+def job(spark, tmp_path_factory):
+    # 배포 위치와 같은 jobs/config, jobs/lexicon 구조로 저장소의 설정 / 사전을 복사
+    root = tmp_path_factory.mktemp("jobs_root")
+    for source, target in (("config/popularity.json", "jobs/config/popularity.json"),
+                           ("lexicon/v1.json", "jobs/lexicon/v1.json")):
+        os.makedirs(os.path.dirname(str(root / target)), exist_ok=True)
+        shutil.copy(os.path.join(EMR, source), str(root / target))
+    uri = root.as_uri() + "/"
+    return TransformJob(spark, uri, uri + "transformed_data/", uri)
+
+
+def frames(spark, days):
+    contents, comments = [], []
+    for day in days:
+        for i, (site, model) in enumerate((("clien", "팰리세이드"), ("bobae", "팰리세이드"), ("fmkorea", "싼타페"))):
+            url = f"https://example.com/{day}/{i}"
+            contents.append((site, datetime.strptime(f"{day} 12:00:00", "%Y-%m-%d %H:%M:%S"), model,
+                             f"제목 {i}", "엔진 소음이 심하고 승차감은 좋아요", url, "작성자", 10 * i, 0, i, 100 * i, day))
+            comments.append((url, f"제목 {i}", "연비가 좋네요", day))
+    return spark.createDataFrame(contents, CONTENT_DDL), spark.createDataFrame(comments, COMMENT_DDL)
+
+
+@pytest.mark.parametrize("days", [["2025-02-01"], ["2025-02-01", "2025-02-02"]], ids=["day", "backfill"])
+def test_shuffle_budget(spark, job, days):
+    multi_day = len(days) > 1
+    outputs, _ = job.transform(*frames(spark, days), multi_day=multi_day)
+    try:
+        assert set(outputs) == set(EXPECTED_SHUFFLES)
+        over = {name: (count_shuffles(df), expected_shuffles(name, multi_day)) for name, df in outputs.items()
+                if count_shuffles(df) > expected_shuffles(name, multi_day)}
+        assert not over, f"셔플 기준 초과 (테이블: (실제, 기준)): {over}"
+    finally:
+        job._release()
@@ -0,0 +1,206 @@
+"""
+Aho–Corasick 다중 패턴 매칭 (키워드 + 감성 단어).
+키워드와 감성 단어 전체로 오토마톤을 한 번 만들고, 텍스트를 한 번만 훑어
+- 매칭된 키워드와 등장 횟수
+- 게시글 전체의 긍정 / 부정 단어 수
+- 키워드별 긍정 / 부정 단어 수 (키워드가 등장한 문장 안의 감성 단어만 해당 키워드에 귀속)
+를 함께 구합니다.
+pyahocorasick(C 구현)이 설치되어 있으면 사용하고, 없으면 같은 결과를 내는 순수 Python 오토마톤을 사용합니다.
+"""
+import re
+from bisect import bisect_right
+from collections import deque
+
+import pandas as pd
+from pyspark.sql import functions as F, types as T
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+SENTIMENTS = ("positive", "negative")
+
+# 감성 귀속 범위를 나누는 문장 경계
+SENTENCE_BOUNDARY = re.compile(r"[.!?\n。]+")
+
+MATCH_TYPE = T.StructType([
+    T.StructField("keywords", T.ArrayType(T.StringType())),
+    T.StructField("counts", T.ArrayType(T.IntegerType())),
+    T.StructField("positive", T.IntegerType()),
+    T.StructField("negative", T.IntegerType()),
+    T.StructField("keyword_positive", T.ArrayType(T.IntegerType())),
+    T.StructField("keyword_negative", T.ArrayType(T.IntegerType())),
+])
+
+
+class _PythonAutomaton:
+    """pyahocorasick이 없을 때 사용하는 Aho–Corasick 오토마톤 (goto / fail / output)"""
+
+    def __init__(self, patterns):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, pattern in enumerate(patterns):
+            state = 0
+            for char in pattern:
+                if char not in self.goto[state]:
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append([])
+                    self.goto[state][char] = len(self.goto) - 1
+                state = self.goto[state][char]
+            self.output[state].append(index)
+
+        # BFS로 실패 링크를 만들고, 실패 링크 쪽의 출력도 합쳐 둠
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] = self.output[next_state] + self.output[self.fail[next_state]]
+
+    def iter(self, text):
+        """텍스트의 모든 매칭 위치에서 (끝 위치, 패턴 번호)를 yield"""
+        goto, fail, output = self.goto, self.fail, self.output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                yield position, index
+
+
+class TextMatcher:
+    """
+    키워드 / 감성 단어로 오토마톤을 한 번 만들어 두고, 텍스트마다 한 번의 순회로 매칭 결과를 구함.
+    - 키워드: 겹치는 매칭도 모두 셈 (기존 `kw in text`와 같은 키워드가 매칭됨)
+    - 감성 단어: 겹치지 않게 가장 왼쪽 · 가장 긴 단어만 셈 ("멋진가" 안의 "멋진"을 중복으로 세지 않음)
+    """
+
+    def __init__(self, keywords, sentiment=None):
+        sentiment = sentiment or {}
+        # 같은 단어가 키워드이면서 감성 단어일 수 있으므로 단어 → [(종류, 값)]으로 묶음
+        labels = {}
+        for keyword in keywords:
+            if keyword:
+                labels.setdefault(keyword, []).append(("keyword", keyword))
+        for polarity in SENTIMENTS:
+            for word in sentiment.get(polarity, []):
+                if word and ("sentiment", polarity) not in labels.get(word, []):
+                    labels.setdefault(word, []).append(("sentiment", polarity))
+        self.patterns = list(labels)
+        self.labels = [labels[pattern] for pattern in self.patterns]
+        self.lengths = [len(pattern) for pattern in self.patterns]
+        if ahocorasick is not None:
+            self.automaton = ahocorasick.Automaton()
+            for index, pattern in enumerate(self.patterns):
+                self.automaton.add_word(pattern, index)
+            if self.patterns:
+                self.automaton.make_automaton()
+        else:
+            self.automaton = _PythonAutomaton(self.patterns)
+
+    def _iter(self, text):
+        if not self.patterns:
+            return iter(())
+        return self.automaton.iter(text)
+
+    def scan(self, text):
+        """
+        텍스트 → ({키워드: 등장 횟수}, {"positive": n, "negative": n}, {키워드: {"positive": n, "negative": n}})
+        키워드는 처음 등장한 순서
+        """
+        keyword_counts = {}
+        totals = {polarity: 0 for polarity in SENTIMENTS}
+        attributed = {}
+        if not text:
+            return keyword_counts, totals, attributed
+
+        keyword_hits, sentiment_hits = [], []
+        for end, index in self._iter(text):
+            start = end - self.lengths[index] + 1
+            for kind, value in self.labels[index]:
+                if kind == "keyword":
+                    keyword_counts[value] = keyword_counts.get(value, 0) + 1
+                    keyword_hits.append((start, value))
+                else:
+                    sentiment_hits.append((start, -self.lengths[index], value))
+
+        # 감성 단어: 시작 위치 순, 같은 위치면 긴 단어 우선으로 겹치지 않는 매칭만 선택
+        sentiments = []
+        covered = 0
+        for start, negative_length, polarity in sorted(sentiment_hits):
+            if start >= covered:
+                sentiments.append((start, polarity))
+                totals[polarity] += 1
+                covered = start - negative_length
+
+        # 키워드가 등장한 문장의 감성 단어 수를 해당 키워드에 귀속 (문장마다 한 번)
+        if keyword_hits and sentiments:
+            boundaries = [match.end() for match in SENTENCE_BOUNDARY.finditer(text)]
+            sentence_sentiment = {}
+            for start, polarity in sentiments:
+                counts = sentence_sentiment.setdefault(bisect_right(boundaries, start), dict.fromkeys(SENTIMENTS, 0))
+                counts[polarity] += 1
+            keyword_sentences = {}
+            for start, keyword in keyword_hits:
+                keyword_sentences.setdefault(keyword, set()).add(bisect_right(boundaries, start))
+            for keyword, sentences in keyword_sentences.items():
+                attributed[keyword] = {
+                    polarity: sum(sentence_sentiment.get(sentence, {}).get(polarity, 0) for sentence in sentences)
+                    for polarity in SENTIMENTS
+                }
+        return keyword_counts, totals, attributed
+
+    def count(self, text):
+        """{키워드: 등장 횟수} (처음 등장한 순서). 텍스트가 비었으면 빈 dict"""
+        return self.scan(text)[0]
+
+
+# 실행기(Python 워커 프로세스)마다 오토마톤을 한 번만 만들기 위한 캐시
+_matchers = {}
+
+
+def get_matcher(keywords, sentiment=None, key=None):
+    """key(기본: 키워드 / 감성 단어 튜플)별로 TextMatcher를 한 번만 생성해 재사용"""
+    if key is None:
+        key = (tuple(keywords), tuple(tuple((sentiment or {}).get(polarity, ())) for polarity in SENTIMENTS))
+    matcher = _matchers.get(key)
+    if matcher is None:
+        matcher = _matchers[key] = TextMatcher(keywords, sentiment)
+    return matcher
+
+
+def text_match_udf(keywords, sentiment, key=None):
+    """
+    텍스트 컬럼 → MATCH_TYPE struct (매칭된 키워드가 없으면 keywords가 null)
+    Arrow 배치 단위 pandas UDF이며, 오토마톤은 실행기에서 key(사전 버전)별로 처음 호출될 때 한 번만 만들어집니다.
+    keyword_positive / keyword_negative는 keywords와 같은 순서입니다.
+    """
+    keywords = list(keywords)
+    sentiment = {polarity: list(sentiment.get(polarity, [])) for polarity in SENTIMENTS}
+
+    @F.pandas_udf(MATCH_TYPE)
+    def match_text(texts: pd.Series) -> pd.DataFrame:
+        matcher = get_matcher(keywords, sentiment, key=key)
+        rows = {field: [] for field in MATCH_TYPE.fieldNames()}
+        for text in texts:
+            keyword_counts, totals, attributed = matcher.scan(text)
+            found = list(keyword_counts) or None
+            rows["keywords"].append(found)
+            rows["counts"].append(list(keyword_counts.values()) if found else None)
+            rows["positive"].append(totals["positive"])
+            rows["negative"].append(totals["negative"])
+            for polarity in SENTIMENTS:
+                rows[f"keyword_{polarity}"].append(
+                    [attributed.get(keyword, {}).get(polarity, 0) for keyword in found] if found else None
+                )
+        return pd.DataFrame(rows)
+
+    return match_text
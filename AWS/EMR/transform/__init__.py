@@ -0,0 +1,8 @@
+"""
+merge_data → transformed_data 변환 라이브러리.
+steps: 순수 변환 함수 / storage: 읽기 · 파티션 저장 / plan: 셔플 수 확인 / job: 하루 · 여러 날짜(backfill) 실행 / cli: spark-submit 진입점
+"""
+from .job import TransformJob
+from .steps import aggregate, extract_keywords, preprocess, score_popularity, score_sentiment
+
+__all__ = ["TransformJob", "aggregate", "extract_keywords", "preprocess", "score_popularity", "score_sentiment"]
@@ -0,0 +1,72 @@
+"""
+변환 작업 CLI.
+
+    # EMR step (기본값: 오늘, s3a://hmg5th-4-bucket/)
+    spark-submit --py-files ...,transform.zip processing.py
+    # 기간 지정(backfill: 한 번에 읽고 날짜 파티션별 저장) / 다른 저장 위치 / 셔플 파티션 수
+    spark-submit ... processing.py --start 2025-02-01 --end 2025-02-07 \
+        --input-root s3a://hmg5th-4-bucket/ --output-root s3a://hmg5th-4-bucket/transformed_data/ --shuffle-partitions 64
+"""
+import argparse
+import os
+from datetime import datetime, timedelta
+
+from pyspark.sql import SparkSession
+
+from .job import TransformJob
+
+BUCKET = "hmg5th-4-bucket"
+
+
+def date_range(start, end):
+    """yyyy-mm-dd 시작 ~ 끝(포함) 날짜 목록"""
+    day, last = datetime.strptime(start, "%Y-%m-%d"), datetime.strptime(end, "%Y-%m-%d")
+    if day > last:
+        raise ValueError(f"시작 날짜가 끝 날짜보다 늦음: {start} > {end}")
+    days = []
+    while day <= last:
+        days.append(day.strftime("%Y-%m-%d"))
+        day += timedelta(days=1)
+    return days
+
+
+def parse_args(argv=None):
+    today = datetime.now().strftime("%Y-%m-%d")
+    # 로컬 벤치마크 등에서는 DATA_BASE=file:///... 로 기준 경로를 바꿔 실행
+    data_base = os.getenv("DATA_BASE", f"s3a://{BUCKET}/")
+
+    parser = argparse.ArgumentParser(description="merge_data → transformed_data 변환")
+    parser.add_argument("--start", default=today, help="처리할 첫 날짜 (기본: 오늘)")
+    parser.add_argument("--end", help="처리할 마지막 날짜 (기본: --start)")
+    parser.add_argument("--input-root", default=data_base, help="merge_data/가 있는 기준 경로")
+    parser.add_argument("--output-root", help="출력 경로 (기본: {input-root}transformed_data/)")
+    parser.add_argument("--config-root", help="jobs/config, jobs/lexicon이 있는 기준 경로 (기본: --input-root)")
+    parser.add_argument("--lexicon-version", default=os.getenv("LEXICON_VERSION", "v1"))
+    parser.add_argument("--alarm-threshold", type=float, default=15)
+    parser.add_argument("--no-alarm", action="store_true", default=os.getenv("WRITE_ALARM", "1") != "1",
+                        help="알람 CSV를 쓰지 않음 (마이크로 배치가 알람을 보내는 경우, WRITE_ALARM=0과 같음 / 여러 날짜는 항상 쓰지 않음)")
+    parser.add_argument("--plan-check", action="store_true", default=os.getenv("PLAN_CHECK") == "1",
+                        help="셔플 수가 기준보다 늘어나면 중단 (PLAN_CHECK=1과 같음)")
+    parser.add_argument("--shuffle-partitions", type=int, help="spark.sql.shuffle.partitions")
+    parser.add_argument("--max-records-per-file", type=int, default=int(os.getenv("MAX_RECORDS_PER_FILE", "500000")))
+    args = parser.parse_args(argv)
+    args.end = args.end or args.start
+    args.output_root = args.output_root or f"{args.input_root}transformed_data/"
+    args.config_root = args.config_root or args.input_root
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    days = date_range(args.start, args.end)
+
+    # SparkSession 생성 (이미 생성되어 있다면 그대로 사용)
+    spark = SparkSession.builder.appName("Transform").getOrCreate()
+    if args.shuffle_partitions:
+        spark.conf.set("spark.sql.shuffle.partitions", args.shuffle_partitions)
+
+    job = TransformJob(spark, args.input_root, args.output_root, args.config_root,
+                       lexicon_version=args.lexicon_version, alarm_threshold=args.alarm_threshold,
+                       write_alarm=not args.no_alarm, plan_check=args.plan_check,
+                       max_records_per_file=args.max_records_per_file)
+    job.run(days)
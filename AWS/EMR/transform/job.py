@@ -0,0 +1,117 @@
+"""
+변환 작업: 읽기 → 변환 단계(steps) → 실행 계획 확인 → 파티션 저장 → 기간별 추이 갱신.
+사전 / 화제도 설정 / UDF는 세션당 한 번만 준비하므로 여러 날짜를 같은 Spark 세션에서 처리할 수 있습니다.
+
+여러 날짜(backfill)는 날짜마다 반복하지 않고 모든 날짜를 한 번에 읽어 한 번 변환한 뒤 date 파티션별로 저장
+→ 작업(job / stage) 수가 날짜 수와 무관하고, 처리 시간은 데이터 크기와 클러스터 크기에 따름
+"""
+from lexicon import load_lexicon
+from popularity import load_config
+from text_match import text_match_udf
+from trends import update_trends, update_trends_range
+
+from .plan import check_plan
+from .steps import CATEGORY_KEYS, aggregate, extract_keywords, preprocess, score_popularity, score_sentiment
+from .storage import configure, layout, read_merged, write_table
+
+
+class TransformJob:
+    def __init__(self, spark, input_root, output_root, config_root, lexicon_version="v1", alarm_threshold=15,
+                 write_alarm=True, plan_check=False, max_records_per_file=500000):
+        self.spark = spark
+        self.input_root = input_root
+        self.output_root = output_root
+        self.alarm_threshold = alarm_threshold
+        self.write_alarm = write_alarm
+        self.plan_check = plan_check
+        configure(spark, max_records_per_file)
+
+        # 가중치를 바꿀 때는 config/popularity.json만 수정해 올리면 됨
+        self.popularity_config = load_config(spark, f"{config_root}jobs/config/popularity.json")
+        # 사전을 바꿀 때는 새 버전 파일을 올리고 버전만 바꾸면 됨 (검증 실패 시 작업 중단)
+        lexicon = load_lexicon(spark, f"{config_root}jobs/lexicon/{lexicon_version}.json")
+        # 드라이버에서 오토마톤을 한 번 만들어 사전 오류를 실행기 작업 전에 확인
+        lexicon.compile()
+        self.df_keyword_category = lexicon.keyword_frame(spark)
+        # Aho–Corasick 오토마톤은 실행기마다 사전 버전별로 한 번만 생성
+        self.match_text_udf = text_match_udf(lexicon.keywords, lexicon.sentiment, key=lexicon.key)
+        self._cached = []
+
+    def _cache(self, df):
+        self._cached.append(df.cache())
+        return df
+
+    def _release(self):
+        for df in self._cached:
+            df.unpersist()
+        self._cached = []
+
+    def transform(self, df_contents, df_comments, multi_day=False):
+        """입력(본문, 댓글) → ({테이블: 저장할 DataFrame}, 집계 dict)"""
+        df_contents, df_comment_text = preprocess(df_contents, df_comments)
+        df_contents = score_popularity(df_contents, self.spark, self.popularity_config)
+        df_posts, df_keywords = extract_keywords(df_contents, df_comment_text, self.match_text_udf,
+                                                 self.df_keyword_category)
+        # 게시글과 키워드 테이블이 같은 매칭 결과를 쓰므로 캐시 (댓글 집계 / join / UDF를 한 번만 실행)
+        self._cache(df_posts)
+        self._cache(df_keywords)
+
+        aggregates = aggregate(df_keywords, df_contents, self.alarm_threshold)
+        df_category = self._cache(aggregates["category"])
+        outputs = {
+            "post": score_sentiment(df_posts),
+            "keyword": aggregates["keyword"],
+            "live_popularity": df_category.select(*CATEGORY_KEYS, "popularity_sum"),
+            "live_category": aggregates["post_category"],
+            "live_sentiment": df_category.select(*CATEGORY_KEYS, "positive_sum", "negative_sum"),
+            "alarm": aggregates["alarm"],
+        }
+        return {name: layout(df, name, multi_day) for name, df in outputs.items()}, aggregates
+
+    def run_day(self, day):
+        df_contents, df_comments, _ = read_merged(self.spark, self.input_root, [day])
+        outputs, aggregates = self.transform(df_contents, df_comments)
+        check_plan(outputs, self.plan_check)
+
+        for name, df in outputs.items():
+            if name != "alarm":
+                write_table(df, name, self.output_root)
+
+        # popularity가 기준 이상인 게시물이 있는 경우에만 알람 저장 (transformed_data/alarm/date=YYYY-MM-DD/)
+        # count()로 전체를 세지 않고 isEmpty(내부적으로 limit 1)로 한 건만 확인
+        # 마이크로 배치(micro_batch.py)가 알람을 보내는 경우 write_alarm=False (같은 날짜 알람을 덮어쓰고 다시 보내지 않도록)
+        if self.write_alarm and not aggregates["alarm"].isEmpty():
+            write_table(outputs["alarm"], "alarm", self.output_root)
+
+        # 오늘 집계를 trend_*_daily/date=오늘에 저장하고, 어제의 이동 합계 + 오늘 - 기간에서 빠지는 날로 증분 갱신
+        update_trends(self.spark, {"category": aggregates["category"], "keyword": aggregates["keyword_mentions"]},
+                      day, self.output_root)
+
+        # 다음 날짜를 위해 이번 날짜의 캐시 해제
+        self._release()
+
+    def run_backfill(self, days):
+        """
+        여러 날짜를 Spark 작업 한 번으로 처리 (merge_data 파일을 한 번에 읽고, date 파티션별로 dynamic overwrite)
+        지난 날짜의 알람은 저장하지 않음 (Slack으로 다시 보내지 않도록)
+        """
+        df_contents, df_comments, days = read_merged(self.spark, self.input_root, days)
+        print(f"📅 {days[0]} ~ {days[-1]} ({len(days)}일) 한 번에 변환 시작")
+        outputs, aggregates = self.transform(df_contents, df_comments, multi_day=True)
+        del outputs["alarm"]
+        check_plan(outputs, self.plan_check, multi_day=True)
+
+        for name, df in outputs.items():
+            write_table(df, name, self.output_root)
+
+        update_trends_range(self.spark,
+                            {"category": aggregates["category"], "keyword": aggregates["keyword_mentions"]},
+                            days, self.output_root)
+        self._release()
+
+    def run(self, days):
+        if len(days) > 1:
+            self.run_backfill(days)
+            return
+        print(f"📅 {days[0]} 변환 시작")
+        self.run_day(days[0])
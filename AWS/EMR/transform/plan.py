@@ -0,0 +1,42 @@
+"""
+실행 계획 확인.
+저장 전에 출력별 셔플(Exchange, broadcast 제외) 수를 출력하고,
+enforce(PLAN_CHECK=1 / --plan-check)이면 기준보다 셔플이 늘어난 경우 작업을 중단 (코드 수정으로 셔플이 추가되는 회귀 방지)
+"""
+import re
+
+from .storage import TABLES
+
+# 공통: 댓글 url별 집계 1 + 본문 / 댓글 url join 1 (댓글 집계가 작으면 broadcast join으로 0)
+# post / keyword는 저장 전 파티션 컬럼 repartition 1 (여러 날짜를 한 번에 처리하면 작은 결과도 repartition 1)
+EXPECTED_SHUFFLES = {
+    "post": 3,
+    "keyword": 3,
+    "live_popularity": 3,
+    "live_category": 3,
+    "live_sentiment": 3,
+    "alarm": 0,
+}
+SHUFFLE = re.compile(r"(?<![A-Za-z])Exchange ")
+
+
+def count_shuffles(df):
+    """물리 실행 계획의 셔플 Exchange 수 (BroadcastExchange / ReusedExchange 제외)"""
+    return len(SHUFFLE.findall(df._jdf.queryExecution().executedPlan().toString()))
+
+
+def expected_shuffles(name, multi_day=False):
+    _, small = TABLES[name]
+    return EXPECTED_SHUFFLES[name] + (1 if multi_day and small else 0)
+
+
+def check_plan(outputs, enforce=False, multi_day=False):
+    """outputs: {테이블: 저장할 DataFrame}"""
+    problems = []
+    for name, df in outputs.items():
+        shuffles, expected = count_shuffles(df), expected_shuffles(name, multi_day)
+        print(f"🔍 {name}: 셔플 {shuffles}회 (기준 {expected}회)")
+        if shuffles > expected:
+            problems.append(f"{name}: 셔플 {shuffles}회 > 기준 {expected}회")
+    if problems and enforce:
+        raise RuntimeError("실행 계획 셔플 증가:\n- " + "\n- ".join(problems))
@@ -0,0 +1,95 @@
+"""
+변환 단계 (DataFrame → DataFrame 순수 함수, 읽기 / 저장 / 캐시 없음).
+모든 행에 date 컬럼(merge_data 날짜)이 있으며, 집계 키에도 date가 포함되므로 여러 날짜를 한 번에 넘겨도 됩니다.
+"""
+from pyspark.sql import functions as F
+
+from popularity import with_popularity
+
+METRICS = ("likes", "views", "comments_count")
+CATEGORY_KEYS = ("date", "model", "large_category", "small_category")
+POST_COLUMNS = ("date", "site", "datetime", "model", "title", "url", "popularity", "views", "positive", "negative")
+
+
+def preprocess(df_contents, df_comments):
+    """
+    불필요한 컬럼 / null 제거 후 (본문, url별 댓글 텍스트) 반환
+    merge_data는 공통 스키마(common/schema.py)로 저장되어 datetime은 timestamp, likes/views/comments_count는 int64
+    → 문자열 변환 없이 그대로 사용하고, 값을 찾지 못한(null) 카운트만 0으로 채움
+    """
+    df_contents = df_contents.drop("author", "hates") \
+        .filter(F.col("title").isNotNull() & F.col("content").isNotNull()) \
+        .fillna(0, subset=list(METRICS))
+
+    # URL 별 댓글 합치기 (공백으로 연결)
+    df_comment_text = df_comments.filter(F.col("comment").isNotNull()) \
+        .groupBy("date", "url") \
+        .agg(F.concat_ws(" ", F.collect_list("comment")).alias("comment_agg"))
+    return df_contents, df_comment_text
+
+
+def score_popularity(df_contents, spark, config):
+    """
+    화제도(popularity) 컬럼 추가
+    사이트별 평균 / 가중치 테이블(작은 테이블이므로 broadcast join)로 내장 식 계산 (Python UDF 없음)
+    """
+    return with_popularity(df_contents, spark, config)
+
+
+def extract_keywords(df_contents, df_comment_text, match_text_udf, df_keyword_category):
+    """
+    (게시글, 키워드 행) 반환
+    - 게시글: title + content + 댓글을 pandas UDF로 한 번만 훑어 매칭 결과(matches)를 붙이고, 키워드가 없는 게시글은 제외
+    - 키워드 행: 매칭된 키워드마다 한 행 + 키워드가 등장한 문장의 긍정 / 부정 단어 수 + 소분류 / 대분류 (broadcast join 한 번)
+    """
+    df_posts = df_contents.join(df_comment_text, on=["date", "url"], how="left") \
+        .withColumn("text", F.concat_ws(" ", F.col("title"), F.col("content"),
+                                        F.coalesce(F.col("comment_agg"), F.lit("")))) \
+        .select("date", "url", "site", "datetime", "model", "title", "views", "popularity", "text") \
+        .withColumn("matches", match_text_udf(F.col("text"))) \
+        .filter(F.col("matches.keywords").isNotNull()) \
+        .drop("text")
+
+    df_keywords = df_posts.select("date", "model", "url", "title", "popularity", "matches",
+                                  F.posexplode("matches.keywords").alias("pos", "keyword")) \
+        .withColumn("keyword_positive", F.col("matches.keyword_positive")[F.col("pos")]) \
+        .withColumn("keyword_negative", F.col("matches.keyword_negative")[F.col("pos")]) \
+        .join(F.broadcast(df_keyword_category), on="keyword", how="left") \
+        .select("date", "model", "url", "title", "keyword", "small_category", "large_category", "popularity",
+                "keyword_positive", "keyword_negative")
+    return df_posts, df_keywords
+
+
+def score_sentiment(df_posts):
+    """게시글별 긍정 / 부정 단어 수 (키워드 매칭과 같은 순회에서 이미 계산된 matches.positive / negative)"""
+    return df_posts.withColumn("positive", F.col("matches.positive")) \
+        .withColumn("negative", F.col("matches.negative")) \
+        .select(*POST_COLUMNS)
+
+
+def aggregate(df_keywords, df_contents, alarm_threshold=15):
+    """
+    키워드 행 / 본문 → 출력 테이블 dict
+    결과는 parquet로 저장되어 조회 시 다시 정렬되므로 orderBy(전역 정렬 = 범위 셔플)는 하지 않음
+    - category: 소분류별 popularity / 키워드 귀속 감성 / 언급 수 (live_popularity와 live_sentiment는 키가 같으므로 groupBy 한 번)
+    - post_category: (url, small_category) 중복 제거 (df_keywords에 게시글 정보가 있으므로 게시글과 다시 join하지 않음)
+    - keyword_mentions: model, keyword별 popularity 합계 / 언급 수
+    - keyword: 게시글 - 키워드 - 카테고리
+    - alarm: popularity가 기준 이상인 게시글
+    """
+    df_category = df_keywords.groupBy(*CATEGORY_KEYS) \
+        .agg(F.sum("popularity").alias("popularity_sum"),
+             F.sum("keyword_positive").alias("positive_sum"),
+             F.sum("keyword_negative").alias("negative_sum"),
+             F.count("*").alias("mentions"))
+    return {
+        "category": df_category,
+        "post_category": df_keywords.select("date", "model", "url", "title", "popularity", "small_category")
+            .dropDuplicates(["date", "url", "small_category"]),
+        "keyword_mentions": df_keywords.groupBy("date", "model", "keyword")
+            .agg(F.sum("popularity").alias("popularity_sum"),
+                 F.count("*").alias("mentions")),
+        "keyword": df_keywords.select("date", "model", "url", "keyword", "small_category", "large_category"),
+        "alarm": df_contents.select("date", "title", "url", "popularity")
+            .filter(F.col("popularity") >= alarm_threshold),
+    }
@@ -0,0 +1,74 @@
+"""
+입력(merge_data) 읽기와 transformed_data 저장.
+
+transformed_data/{테이블}/date=YYYY-MM-DD/[site=.../]model=.../part-*.parquet (Hive 파티션)
+- 조회 시 date / site / model 조건으로 파티션 프루닝
+- dynamic partition overwrite: 재실행하면 이번 실행에 포함된 파티션(해당 날짜 · 모델)만 덮어씀
+- 파일 크기: 작은 집계 결과는 coalesce(1)(셔플 없음)로 파티션마다 파일 하나,
+  게시글 / 키워드는 파티션 컬럼으로 repartition해 파티션마다 파일 하나 + maxRecordsPerFile 행마다 분할
+"""
+from pyspark.sql import functions as F
+
+# 테이블 → (파티션 컬럼, 작은 결과 여부)
+TABLES = {
+    "post": (("date", "site", "model"), False),
+    "keyword": (("date", "model"), False),
+    "live_popularity": (("date", "model"), True),
+    "live_category": (("date", "model"), True),
+    "live_sentiment": (("date", "model"), True),
+    "alarm": (("date",), True),
+}
+
+
+def configure(spark, max_records_per_file):
+    spark.conf.set("spark.sql.sources.partitionOverwriteMode", "dynamic")
+    spark.conf.set("spark.sql.files.maxRecordsPerFile", max_records_per_file)
+
+
+def _exists(spark, path):
+    jvm_path = spark._jvm.org.apache.hadoop.fs.Path(path)
+    return jvm_path.getFileSystem(spark._jsc.hadoopConfiguration()).exists(jvm_path)
+
+
+def read_merged(spark, input_root, days):
+    """
+    merge_data/{contents,comments}/{날짜}.parquet 여러 날짜를 한 번에 읽어 date 컬럼을 붙인 (본문, 댓글, 읽은 날짜) 반환
+    날짜별로 따로 읽지 않고 파일 목록 하나로 읽으므로(스캔 한 번) 작업 수가 날짜 수가 아니라 데이터 크기에 비례
+    본문 파일이 없는 날짜는 건너뜀
+    """
+    days = [day for day in days if _exists(spark, f"{input_root}merge_data/contents/{day}.parquet")]
+    if not days:
+        raise FileNotFoundError(f"처리할 merge_data가 없음: {input_root}merge_data/contents/")
+    content_paths = [f"{input_root}merge_data/contents/{day}.parquet" for day in days]
+    comment_paths = [path for path in (f"{input_root}merge_data/comments/{day}.parquet" for day in days)
+                     if _exists(spark, path)]
+
+    # 파일 경로의 날짜(.../{yyyy-mm-dd}.parquet)를 date 컬럼으로
+    file_date = F.regexp_extract(F.input_file_name(), r"(\d{4}-\d{2}-\d{2})\.parquet", 1)
+    df_contents = spark.read.parquet(*content_paths).withColumn("date", file_date)
+    if comment_paths:
+        df_comments = spark.read.parquet(*comment_paths).withColumn("date", file_date)
+    else:
+        df_comments = spark.createDataFrame([], "url string, title string, comment string, date string")
+    return df_contents, df_comments, days
+
+
+def layout(df, name, multi_day=False):
+    """
+    파일 크기 규칙 적용: 하루치 작은 결과는 coalesce(셔플 없음), 그 외에는 파티션 컬럼으로 repartition
+    (여러 날짜를 한 번에 처리할 때는 작은 결과도 날짜 파티션별로 나눠 여러 task가 함께 저장)
+    """
+    partition_cols, small = TABLES[name]
+    return df.coalesce(1) if small and not multi_day else df.repartition(*partition_cols)
+
+
+def write_table(df, name, output_root):
+    """레이아웃을 적용한 df를 transformed_data/{name}에 파티션 단위로 덮어씀 (alarm은 헤더 포함 CSV)"""
+    partition_cols, _ = TABLES[name]
+    writer = df.write.mode("overwrite").partitionBy(*partition_cols)
+    if name == "alarm":
+        # 날짜 파티션 하나에 CSV 파일 하나 (Slack 알림 Lambda가 파일마다 메시지 한 번)
+        writer.option("header", "true").csv(output_root + name)
+    else:
+        writer.parquet(output_root + name)
+    print(f"✅ 저장: {output_root}{name} ({', '.join(partition_cols)} 파티션)")
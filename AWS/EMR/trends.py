@@ -0,0 +1,129 @@
+"""
+기간별(7일 / 30일) 추이 집계.
+processing.py가 만든 오늘의 집계(차종 · 카테고리별, 차종 · 키워드별)를 날짜 파티션 테이블에 저장하고,
+이를 이용해 이동 기간 합계를 증분으로 갱신합니다.
+
+transformed_data/
+  trend_category_daily/date=YYYY-MM-DD/             model, large_category, small_category, popularity_sum, positive_sum, negative_sum, mentions
+  trend_category_rolling/window=7/date=YYYY-MM-DD/  같은 컬럼, date까지 최근 7일 합계 (window=30도 동일)
+  trend_keyword_daily/ , trend_keyword_rolling/     model, keyword, popularity_sum, mentions
+
+rolling(오늘) = rolling(어제) + daily(오늘) - daily(오늘 - window일)
+→ 오늘 실행에서 읽는 것은 작은 파티션 세 개뿐이며, 어제 결과가 없으면(첫 실행 / 실행하지 않은 날) 최근 window일의 daily로 다시 계산
+같은 날짜를 다시 실행해도 어제 결과를 기준으로 계산하므로 결과가 같음 (dynamic partition overwrite)
+
+여러 날짜를 한 번에 처리(backfill)할 때는 날짜 순서대로 증분하지 않고,
+(기준 날짜, 합산할 날짜) 쌍 테이블을 broadcast join해 영향을 받는 모든 날짜의 이동 합계를 window마다 한 번에 다시 계산 (update_trends_range)
+"""
+from datetime import datetime, timedelta
+from pyspark.sql import functions as F
+
+WINDOWS = (7, 30)
+
+# 테이블 → (키 컬럼, 합계 컬럼)
+TRENDS = {
+    "category": (("model", "large_category", "small_category"),
+                 ("popularity_sum", "positive_sum", "negative_sum", "mentions")),
+    "keyword": (("model", "keyword"), ("popularity_sum", "mentions")),
+}
+
+
+def _exists(spark, path):
+    jvm_path = spark._jvm.org.apache.hadoop.fs.Path(path)
+    return jvm_path.getFileSystem(spark._jsc.hadoopConfiguration()).exists(jvm_path)
+
+
+def _shift(day, days):
+    return (datetime.strptime(day, "%Y-%m-%d") + timedelta(days=days)).strftime("%Y-%m-%d")
+
+
+def _sum(df, keys, measures):
+    """키별 합계, 언급 수가 0인 행(기간에서 빠진 항목)은 제거 (더하고 뺀 popularity_sum의 실수 오차와 무관)"""
+    df = df.groupBy(*keys).agg(*(F.sum(measure).alias(measure) for measure in measures))
+    return df.filter(F.col("mentions") != 0)
+
+
+def rolling(spark, daily, name, today, window, output_base):
+    """오늘의 daily 집계로 window일 이동 합계를 만듦 (어제 결과가 있으면 증분, 없으면 재계산)"""
+    keys, measures = TRENDS[name]
+    daily_path = f"{output_base}trend_{name}_daily"
+    previous_path = f"{output_base}trend_{name}_rolling/window={window}/date={_shift(today, -1)}"
+    expired_path = f"{daily_path}/date={_shift(today, -window)}"
+
+    if _exists(spark, previous_path):
+        parts = [spark.read.parquet(previous_path).select(*keys, *measures), daily]
+        if _exists(spark, expired_path):
+            parts.append(spark.read.parquet(expired_path)
+                         .select(*keys, *(-F.col(measure) for measure in measures)).toDF(*keys, *measures))
+        mode = "증분"
+    else:
+        # 오늘을 제외한 최근 window - 1일 (date 파티션 프루닝)
+        parts = [daily]
+        if _exists(spark, daily_path):
+            parts.append(spark.read.parquet(daily_path)
+                         .filter((F.col("date") > _shift(today, -window)) & (F.col("date") < today))
+                         .select(*keys, *measures))
+        mode = "재계산"
+
+    df = parts[0]
+    for part in parts[1:]:
+        df = df.unionByName(part)
+    print(f"📈 trend_{name} {window}일: {mode}")
+    return _sum(df, keys, measures)
+
+
+def update_trends(spark, dailies, today, output_base):
+    """
+    dailies: {"category": 오늘 집계 DataFrame, "keyword": 오늘 집계 DataFrame}
+    daily 파티션을 저장한 뒤 WINDOWS별 이동 합계를 저장 (이번 날짜 파티션만 덮어씀)
+    """
+    for name, daily in dailies.items():
+        keys, measures = TRENDS[name]
+        daily = daily.select(*keys, *measures).coalesce(1).cache()
+        daily.withColumn("date", F.lit(today)) \
+            .write.mode("overwrite").partitionBy("date").parquet(f"{output_base}trend_{name}_daily")
+
+        for window in WINDOWS:
+            rolling(spark, daily, name, today, window, output_base) \
+                .withColumn("window", F.lit(window)).withColumn("date", F.lit(today)) \
+                .coalesce(1) \
+                .write.mode("overwrite").partitionBy("window", "date").parquet(f"{output_base}trend_{name}_rolling")
+        daily.unpersist()
+        print(f"✅ 저장: {output_base}trend_{name}_daily / trend_{name}_rolling (window {', '.join(map(str, WINDOWS))}일)")
+
+
+def update_trends_range(spark, dailies, days, output_base):
+    """
+    dailies: {"category": 여러 날짜 집계 DataFrame(date 포함), "keyword": ...}
+    days 전체의 daily 파티션을 한 번에 저장한 뒤, 이동 합계에 이 날짜들이 포함되는 날짜
+    (첫 날짜 ~ 마지막 날짜 + window - 1일 중 daily가 있는 날짜)의 rolling 파티션을 다시 계산
+    """
+    first, last = min(days), max(days)
+    horizon = max(WINDOWS) - 1
+    for name, daily in dailies.items():
+        keys, measures = TRENDS[name]
+        daily_path = f"{output_base}trend_{name}_daily"
+        daily.select("date", *keys, *measures).repartition("date") \
+            .write.mode("overwrite").partitionBy("date").parquet(daily_path)
+
+        # 계산에 필요한 날짜 범위의 daily만 읽음 (date 파티션 프루닝)
+        stored = spark.read.parquet(daily_path).withColumn("date", F.col("date").cast("string")) \
+            .filter((F.col("date") >= _shift(first, -horizon)) & (F.col("date") <= _shift(last, horizon))) \
+            .cache()
+        available = sorted(row.date for row in stored.select("date").distinct().collect())
+
+        for window in WINDOWS:
+            targets = [day for day in available if first <= day <= _shift(last, window - 1)]
+            if not targets:
+                continue
+            # 기준 날짜마다 최근 window일 (window=30, 60일 backfill이어도 수천 행)
+            calendar = spark.createDataFrame(
+                [(target, _shift(target, -offset)) for target in targets for offset in range(window)],
+                "target string, date string")
+            _sum(stored.join(F.broadcast(calendar), on="date"), ("target", *keys), measures) \
+                .withColumnRenamed("target", "date").withColumn("window", F.lit(window)) \
+                .repartition("date") \
+                .write.mode("overwrite").partitionBy("window", "date").parquet(f"{output_base}trend_{name}_rolling")
+            print(f"📈 trend_{name} {window}일: {targets[0]} ~ {targets[-1]} 재계산 ({len(targets)}일)")
+        stored.unpersist()
+        print(f"✅ 저장: {daily_path} / trend_{name}_rolling ({first} ~ {last})")
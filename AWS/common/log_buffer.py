@@ -0,0 +1,98 @@
+import functools
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+import boto3
+
+LOGGING_LAMBDA_ARN = os.getenv("LOGGING_LAMBDA_ARN", "arn:aws:lambda:ap-northeast-2:473551908409:function:crawling_log_lambda")
+
+# 서로 다른 (source, stage, error) 조합이 이만큼 쌓이면 handler 종료 전이라도 전송
+MAX_EVENTS = int(os.getenv("LOG_BUFFER_MAX_EVENTS", "50"))
+MAX_SAMPLE_URLS = 3
+MAX_ERROR_LENGTH = 500
+
+
+class ErrorLogBuffer:
+    """
+    오류 이벤트를 메모리에 모아 (source, stage, error) 기준으로 중복을 합치고,
+    handler 종료 시(또는 MAX_EVENTS 초과 시) crawling_log_lambda에 한 번의 비동기 invoke로 전송.
+    fork된 워커 프로세스에서는 부모의 버퍼를 이어받지 않고 새로 시작합니다.
+    """
+
+    def __init__(self, source, function_name=LOGGING_LAMBDA_ARN, max_events=MAX_EVENTS):
+        self.source = source
+        self.function_name = function_name
+        self.max_events = max_events
+        self.lock = threading.Lock()
+        self.pid = os.getpid()
+        self.events = {}
+        self.client = None
+
+    def log(self, stage, url, error_message):
+        """기존 log_error(stage, url, error_message)와 같은 형태로 오류 이벤트를 버퍼에 추가"""
+        error_message = str(error_message)[:MAX_ERROR_LENGTH]
+        now = (datetime.utcnow() + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M:%S")
+        with self.lock:
+            self._reset_after_fork()
+            key = (self.source, stage, error_message)
+            event = self.events.get(key)
+            if event is None:
+                event = self.events[key] = {
+                    "source": self.source,
+                    "stage": stage,
+                    "error": error_message,
+                    "count": 0,
+                    "urls": [],
+                    "first_seen": now,
+                }
+            event["count"] += 1
+            event["last_seen"] = now
+            if url and len(event["urls"]) < MAX_SAMPLE_URLS and url not in event["urls"]:
+                event["urls"].append(url)
+            full = len(self.events) >= self.max_events
+        print(f"📌 오류 기록: {stage} {url or ''} {error_message}")
+        if full:
+            self.flush()
+
+    def flush(self):
+        """버퍼의 이벤트를 하나의 payload로 전송하고 비움"""
+        with self.lock:
+            self._reset_after_fork()
+            events = list(self.events.values())
+            self.events = {}
+        if not events:
+            return
+        payload = {
+            "status": "error",
+            "source": self.source,
+            "total": sum(event["count"] for event in events),
+            "events": events,
+        }
+        try:
+            if self.client is None:
+                self.client = boto3.client("lambda")
+            self.client.invoke(
+                FunctionName=self.function_name,
+                InvocationType="Event",
+                Payload=json.dumps(payload, ensure_ascii=False)
+            )
+            print(f"📨 오류 로그 전송: {len(events)}종 / {payload['total']}건")
+        except Exception as e:
+            print(f"❌ 로그 람다 호출 실패: {str(e)}")
+
+    def flush_after(self, handler):
+        """handler 실행이 끝나면(예외 포함) 버퍼를 전송하는 데코레이터"""
+        @functools.wraps(handler)
+        def wrapper(event, context):
+            try:
+                return handler(event, context)
+            finally:
+                self.flush()
+        return wrapper
+
+    def _reset_after_fork(self):
+        if self.pid != os.getpid():
+            self.pid = os.getpid()
+            self.events = {}
+            self.client = None
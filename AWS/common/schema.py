@@ -0,0 +1,122 @@
+"""
+parse → merge → EMR → Redshift가 공유하는 본문 / 댓글 Arrow 스키마.
+parse Lambda가 기록할 때 이 스키마로 변환하므로, 이후 단계에서는 문자열 → 숫자 / 시간 변환이 필요 없습니다.
+"""
+import re
+from datetime import datetime
+import pyarrow as pa
+
+# site / model은 값 종류가 몇 개뿐이라 dictionary 인코딩
+CATEGORY = pa.dictionary(pa.int8(), pa.string())
+
+CONTENT_SCHEMA = pa.schema([
+    ("site", CATEGORY),
+    ("datetime", pa.timestamp("s")),
+    ("model", CATEGORY),
+    ("title", pa.string()),
+    ("content", pa.string()),
+    ("url", pa.string()),
+    ("author", pa.string()),
+    ("likes", pa.int64()),
+    ("hates", pa.int64()),
+    ("comments_count", pa.int64()),
+    ("views", pa.int64()),
+])
+
+COMMENT_SCHEMA = pa.schema([
+    ("url", pa.string()),
+    ("title", pa.string()),
+    ("comment", pa.string()),
+])
+
+# 문자열로 들어온 시간 값의 형식 (사이트별 파서 / 기존 parquet)
+DATETIME_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M", "%Y.%m.%d %H:%M")
+NON_DIGITS = re.compile(r"[^\d-]")
+
+
+def to_int(value):
+    """"1,234" / 12 / "" / "N/A" → 1234 / 12 / None / None"""
+    if value is None or isinstance(value, int):
+        return value
+    if isinstance(value, float):
+        return int(value)
+    digits = NON_DIGITS.sub("", str(value))
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+def to_datetime(value):
+    """datetime / "yyyy-mm-dd HH:MM:SS" 등 → 초 단위 datetime, 변환할 수 없으면("N/A" 등) None"""
+    if value is None or isinstance(value, datetime):
+        return value.replace(microsecond=0) if value else None
+    for date_format in DATETIME_FORMATS:
+        try:
+            return datetime.strptime(str(value).strip(), date_format)
+        except ValueError:
+            pass
+    return None
+
+
+def _plain(schema):
+    """dictionary 컬럼을 값 타입으로 바꾼 스키마 (행 → 테이블 변환용)"""
+    return pa.schema([
+        field.with_type(field.type.value_type) if pa.types.is_dictionary(field.type) else field for field in schema
+    ])
+
+
+def conform_row(row, schema):
+    """행(dict)의 값을 스키마 타입에 맞게 변환 (스키마에 없는 키는 버림)"""
+    conformed = {}
+    for field in schema:
+        value = row.get(field.name)
+        if pa.types.is_integer(field.type):
+            value = to_int(value)
+        elif pa.types.is_timestamp(field.type):
+            value = to_datetime(value)
+        elif value is not None and not isinstance(value, str):
+            value = str(value)
+        conformed[field.name] = value
+    return conformed
+
+
+def rows_to_table(rows, schema):
+    """행(dict) 목록 → 스키마를 강제한 Arrow Table"""
+    table = pa.Table.from_pylist([conform_row(row, schema) for row in rows], schema=_plain(schema))
+    return table.cast(schema)
+
+
+def conform_table(table, schema):
+    """
+    이미 저장된 parquet(Table)을 스키마에 맞게 변환. 타입이 같은 컬럼은 그대로 쓰고
+    (parquet에서 읽으면 timestamp[s]가 timestamp[ms]로 돌아오므로 해당 컬럼만 캐스팅),
+    이전 버전처럼 숫자 / 시간이 문자열인 컬럼은 변환하고 (실패한 값은 null) 없는 컬럼은 null로 채움
+    """
+    if table.schema.equals(schema):
+        return table
+    columns = []
+    for field in schema:
+        if field.name not in table.column_names:
+            columns.append(pa.nulls(table.num_rows, field.type))
+            continue
+        column = table[field.name]
+        if column.type == field.type:
+            columns.append(column)
+            continue
+        if pa.types.is_dictionary(column.type):
+            column = column.cast(column.type.value_type)
+        if column.type == field.type:
+            pass
+        elif pa.types.is_string(column.type) and (pa.types.is_integer(field.type) or pa.types.is_timestamp(field.type)):
+            convert = to_int if pa.types.is_integer(field.type) else to_datetime
+            column = pa.chunked_array([pa.array([convert(value) for value in chunk.to_pylist()], field.type)
+                                       for chunk in column.chunks], field.type)
+        elif pa.types.is_dictionary(field.type):
+            column = column.cast(field.type.value_type)
+        else:
+            column = column.cast(field.type)
+        if pa.types.is_dictionary(field.type):
+            column = column.cast(field.type)
+        columns.append(column)
+    return pa.Table.from_arrays(columns, schema=schema)
@@ -1,21 +1,25 @@
-import requests
 from bs4 import BeautifulSoup
-import json
-import boto3
+import asyncio
 import datetime
-import time
+import os
 import random
 import re
 import html
+from fetch_engine import AsyncFetcher
+from raw_writer import ShardedRawWriter
+from log_buffer import ErrorLogBuffer
 
-# AWS 설정
-s3 = boto3.client('s3')
-lambda_client = boto3.client('lambda')
+# 오류 로그 버퍼
+error_log = ErrorLogBuffer("bobae_extract")
 
 # 환경 변수
 BUCKET_NAME = "hmg5th-4-bucket"
 RAW_HTML_PREFIX = "raw_html/bobae/"
-LOGGING_LAMBDA_ARN = "arn:aws:lambda:ap-northeast-2:473551908409:function:crawling_log_lambda"
+
+# 동시성 / 속도 제한 (호스트당 동시 연결 수, 초당 요청 수, 버스트)
+CONCURRENCY = int(os.getenv("BOBAE_CONCURRENCY", "4"))
+REQUEST_RATE = float(os.getenv("BOBAE_REQUEST_RATE", "3"))
+REQUEST_BURST = int(os.getenv("BOBAE_REQUEST_BURST", "4"))
 
 # 모델 정의(키워드 확장)
 MODEL = {
@@ -40,37 +44,90 @@ HEADERS = {
     "Content-Type": "application/x-www-form-urlencoded"
 }
 
-# 요청 재시도 함수
-def request_with_retries(url, method="GET", data=None, max_retries=3):
-    for attempt in range(max_retries):
-        try:
-            response = requests.post(url, headers=HEADERS, data=data, timeout=10) if method == "POST" else requests.get(url, headers=HEADERS, timeout=10)
-            if response.status_code == 200:
-                return response
-            print(f"⚠️ 요청 실패 {attempt + 1}/{max_retries} (상태 코드: {response.status_code})")
-        except requests.RequestException as e:
-            print(f"⚠️ 요청 오류 {attempt + 1}/{max_retries}: {str(e)}")
-        time.sleep(2)
-    log_error("request_with_retries", url, "최대 재시도 횟수 초과")
-    return None
-
-# 에러 로그 전송 함수
+# 에러 로그 전송 함수 (버퍼에 모아 두고 handler 종료 시 한 번에 전송)
 def log_error(stage, url, error_message):
-    log_payload = {
-        "status": "error",
-        "source": "bobae_extract",
-        "stage": stage,
-        "url": url,
-        "error": error_message
-    }
-    lambda_client.invoke(
-        FunctionName=LOGGING_LAMBDA_ARN,
-        InvocationType="Event",
-        Payload=json.dumps(log_payload)
-    )
+    error_log.log(stage, url, error_message)
+
+def parse_post(post_url, post_text):
+    """게시글 HTML에서 작성 시간과 본문 태그를 추출 (날짜를 찾지 못하면 (None, None))"""
+    post_soup = BeautifulSoup(post_text, "html.parser")
+    count_group_tag = post_soup.select_one("span.countGroup")
+    count_group_text = count_group_tag.get_text(strip=True) if count_group_tag else ""
+
+    date_match = re.search(r"(\d{4}\.\d{2}\.\d{2})\s*\(.*?\)\s*(\d{2}:\d{2})", count_group_text)
+    if not date_match:
+        print(f"❌ 날짜 변환 실패: {post_url} {count_group_text}")
+        return None, None
+    post_date = date_match.group(1).replace('.', '-')
+    post_time = date_match.group(2)
+    post_datetime = datetime.datetime.strptime(f"{post_date} {post_time}:00", "%Y-%m-%d %H:%M:%S")
+    return post_datetime, post_soup.select_one("div.viewbg02")
+
+async def crawl_sub_keyword(fetcher, rank, keyword, sub_keyword, writer, written):
+    """
+    검색 페이지를 순서대로 넘기며, 페이지 내 게시글들은 동시에 가져와 바로 샤드에 기록.
+    rank는 키워드 목록에서의 순서이며, 여러 키워드에 걸린 게시글은 읽을 때 rank가 가장 높은(목록상 마지막) 키워드로 정해짐
+    """
+    print(f"📡 sub: '{sub_keyword}' 키워드 크롤링 시작...")
+    page = 1
+
+    while True:
+        print(f"📄 '{sub_keyword}' 페이지 {page} 크롤링 중...")
+        payload = {"keyword": sub_keyword, "searchField": "ALL", "colle": "community", "page": page}
+        response_text = await fetcher.fetch(BASE_URL, method="POST", data=payload)
+        if not response_text:
+            break
+
+        soup = BeautifulSoup(response_text, "html.parser")
+        posts = soup.select("div.search_Community ul li dt a")
+        if not posts:
+            print("✅ 더 이상 게시글이 없습니다.")
+            break
+
+        post_urls = ["https://www.bobaedream.co.kr" + post["href"] for post in posts]
+        post_texts = await asyncio.gather(*(fetcher.fetch(post_url) for post_url in post_urls))
+
+        # 🔹 검색 결과 순서(최신순)대로 검사하여 기간을 벗어나면 종료
+        for post_url, post_text in zip(post_urls, post_texts):
+            if not post_text:
+                continue
 
+            post_datetime, content_tag = parse_post(post_url, post_text)
+            if post_datetime is None:
+                continue
+
+            if post_datetime < END_TIME:
+                print(f"✅ '{sub_keyword}' 크롤링 기간 초과. 종료.")
+                return
+
+            if not content_tag:
+                log_error("lambda_handler", post_url, "viewbg02 태그 없음")
+                continue
+
+            # 같은 키워드(또는 뒤 순서 키워드)로 이미 기록한 게시글은 다시 쓰지 않음
+            if written.get(post_url, -1) >= rank:
+                continue
+            written[post_url] = rank
+            writer.write(post_url, keyword, html.unescape(content_tag.prettify()), rank=rank)
+
+        page += 1
+
+async def crawl(keywords, writer):
+    """모든 키워드 × 확장 키워드 조합을 하나의 세션에서 동시에 크롤링하며 게시글을 바로 샤드에 기록"""
+    # {url: 기록한 rank} — HTML은 메모리에 두지 않음
+    written = {}
+    async with AsyncFetcher(headers=HEADERS, per_host_limit=CONCURRENCY, rate=REQUEST_RATE,
+                            burst=REQUEST_BURST, on_error=log_error) as fetcher:
+        tasks = []
+        for rank, keyword in enumerate(keywords):
+            print(f"📡 '{keyword}' 키워드 크롤링 시작...")
+            for sub_keyword in MODEL[keyword]:
+                tasks.append(crawl_sub_keyword(fetcher, rank, keyword, sub_keyword, writer, written))
+        await asyncio.gather(*tasks)
+    return writer.records
+
+@error_log.flush_after
 def lambda_handler(event, context):
-    html_data = {}
     print(f"📆 크롤링 기간: {END_TIME} ~ {TODAY}")
     
     # Step Function에서 전달된 키워드 가져오기
@@ -80,80 +137,16 @@ def lambda_handler(event, context):
         print("❌ 키워드가 제공되지 않았습니다.")
         return {"status": "No Keywords Provided"}
     
-    for keyword in keywords:
-        print(f"📡 '{keyword}' 키워드 크롤링 시작...")
-        related_keywords = MODEL[keyword]
-      
-        
-        for sub_keyword in related_keywords:
-            print(f"📡 sub: '{sub_keyword}' 키워드 크롤링 시작...")
-            page = 1
-            stop_flag = False
-
-            while not stop_flag:
-                print(f"📄 페이지 {page} 크롤링 중...")
-                payload = {"keyword": sub_keyword, "searchField": "ALL", "colle": "community", "page": page}
-                response = request_with_retries(BASE_URL, method="POST", data=payload)
-                if not response:
-                    break
-
-                # 🔹 응답 인코딩 변환
-                response.encoding = response.apparent_encoding
-                soup = BeautifulSoup(response.text, "html.parser")
-                posts = soup.select("div.search_Community ul li dt a")
-                if not posts:
-                    print("✅ 더 이상 게시글이 없습니다.")
-                    break
-
-                for post in posts:
-                    post_url = "https://www.bobaedream.co.kr" + post["href"]
-                    post_response = request_with_retries(post_url)
-                    if not post_response:
-                        continue
-
-                    post_response.encoding = post_response.apparent_encoding
-                    post_soup = BeautifulSoup(post_response.text, "html.parser")
-                    count_group_tag = post_soup.select_one("span.countGroup")
-                    count_group_text = count_group_tag.get_text(strip=True)
-                    
-                    date_match = re.search(r"(\d{4}\.\d{2}\.\d{2})\s*\(.*?\)\s*(\d{2}:\d{2})", count_group_text)
-                    if date_match:
-                        post_date = date_match.group(1).replace('.', '-')
-                        post_time = date_match.group(2)
-                        post_datetime = datetime.datetime.strptime(f"{post_date} {post_time}:00", "%Y-%m-%d %H:%M:%S")
-                    else:
-                        print(f"❌ 날짜 변환 실패: {count_group_text}")
-                        continue
-                    
-                    if post_datetime < END_TIME:
-                        print("✅ 크롤링 기간 초과. 종료.")
-                        stop_flag = True
-                        break
-                    
-                    content_tag = post_soup.select_one("div.viewbg02")
-                    if not content_tag:
-                        log_error("lambda_handler", post_url, "viewbg02 태그 없음")
-                        continue
-                    
-                    content_text = html.unescape(content_tag.prettify())
-                    html_data[post_url] = {"keyword": keyword, "html": content_text}
-                
-                if not stop_flag:
-                    page += 1
-                    delay = random.uniform(1, 3)
-                    time.sleep(delay)
-          
-    
-    if html_data:
-        today_str = TODAY.strftime("%Y-%m-%d")
-        file_key = f"{RAW_HTML_PREFIX}{today_str}.json"
-        s3.put_object(
-            Bucket=BUCKET_NAME,
-            Key=file_key,
-            Body=json.dumps(html_data, ensure_ascii=False, indent=4).encode("utf-8-sig"),
-            ContentType="application/json; charset=utf-8"
-        )
-        print(f"✅ 크롤링 완료! 데이터 저장됨: {file_key}")
+    writer = ShardedRawWriter(BUCKET_NAME, RAW_HTML_PREFIX, TODAY.strftime("%Y-%m-%d"))
+    try:
+        asyncio.run(crawl(keywords, writer))
+        count = writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+    if count:
+        print(f"✅ 크롤링 완료! 데이터 저장됨: {writer.base} ({count}건)")
     else:
         print("⚠️ 저장할 데이터가 없습니다.")
 
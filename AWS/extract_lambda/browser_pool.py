@@ -0,0 +1,191 @@
+import asyncio
+import os
+from urllib.parse import urlsplit
+from playwright.async_api import async_playwright
+
+LAUNCH_ARGS = ["--disable-gpu", "--single-process"]
+
+# 브라우저 본체 + 컨텍스트 하나당 대략적인 메모리 사용량 (MB)
+BROWSER_BASE_MB = 512
+CONTEXT_MB = 384
+MAX_POOL_SIZE = 8
+
+# 본문 HTML만 필요하므로 기본적으로 차단하는 리소스 타입
+BLOCKED_RESOURCE_TYPES = ("image", "media", "font", "stylesheet")
+
+# 광고 / 트래커 도메인 (서브도메인 포함 차단)
+AD_TRACKER_DOMAINS = (
+    "doubleclick.net",
+    "googlesyndication.com",
+    "googletagservices.com",
+    "googletagmanager.com",
+    "google-analytics.com",
+    "adservice.google.com",
+    "criteo.com",
+    "criteo.net",
+    "facebook.net",
+    "scorecardresearch.com",
+    "taboola.com",
+    "outbrain.com",
+    "mobon.net",
+    "dable.io",
+    "adfit.kakao.com",
+    "display.ad.daum.net",
+    "realclick.co.kr",
+)
+
+
+def resource_policy(block_types=BLOCKED_RESOURCE_TYPES, block_domains=AD_TRACKER_DOMAINS,
+                    wait_until="domcontentloaded"):
+    """
+    사이트별 요청 차단 정책. RESOURCE_BLOCKING=0이면 차단 없이 기존처럼 전체 페이지를 로드합니다.
+    wait_until은 각 크롤러의 page.goto에 그대로 전달됩니다.
+    """
+    if os.getenv("RESOURCE_BLOCKING", "1") == "0":
+        return {"block_types": frozenset(), "block_domains": (), "wait_until": "load"}
+    return {"block_types": frozenset(block_types), "block_domains": tuple(block_domains), "wait_until": wait_until}
+
+
+def pool_size_for_memory():
+    """BROWSER_POOL_SIZE가 있으면 그 값을, 없으면 Lambda 메모리 크기에 맞춰 동시 컨텍스트 수를 결정"""
+    if os.getenv("BROWSER_POOL_SIZE"):
+        return max(1, int(os.getenv("BROWSER_POOL_SIZE")))
+    memory = int(os.getenv("AWS_LAMBDA_FUNCTION_MEMORY_SIZE", "2048"))
+    return max(1, min(MAX_POOL_SIZE, (memory - BROWSER_BASE_MB) // CONTEXT_MB))
+
+
+class BrowserPool:
+    """
+    Chromium 하나를 띄우고 N개의 격리된 컨텍스트(페이지)가 작업 큐를 나눠 처리하는 풀.
+    작업은 (keyword, target) 튜플이며, 브라우저가 죽으면 풀에서 한 번만 재시작한 뒤
+    실패한 작업을 큐 뒤에 다시 넣어 max_retries 만큼 재시도합니다.
+    재시작도 실패하면(Chromium 실행 실패 / 메모리 부족 등) 현재 작업과 남은 작업을 모두 on_error로 넘기고 종료합니다.
+    """
+
+    def __init__(self, size=None, max_retries=1, on_error=None, policy=None):
+        self.size = size or pool_size_for_memory()
+        self.policy = policy
+        self.max_retries = max_retries
+        self.on_error = on_error
+        self.playwright = None
+        self.browser = None
+        self.generation = 0
+        self.restart_lock = asyncio.Lock()
+
+    async def __aenter__(self):
+        self.playwright = await async_playwright().start()
+        await self._launch()
+        return self
+
+    async def __aexit__(self, *exc):
+        try:
+            await self.browser.close()
+        except Exception:
+            pass
+        await self.playwright.stop()
+
+    async def _launch(self):
+        self.browser = await self.playwright.chromium.launch(args=LAUNCH_ARGS, headless=True)
+        self.generation += 1
+        print(f"🌐 브라우저 실행 (generation {self.generation}, 컨텍스트 {self.size}개)")
+
+    async def _restart(self, generation):
+        """다른 워커가 이미 재시작했다면(generation 변경) 다시 띄우지 않음"""
+        async with self.restart_lock:
+            if generation != self.generation or self.browser.is_connected():
+                return
+            print("♻️ 브라우저 연결 끊김 → 재시작")
+            try:
+                await self.browser.close()
+            except Exception:
+                pass
+            await self._launch()
+
+    async def _open_page(self):
+        context = await self.browser.new_context()
+        if self.policy and (self.policy["block_types"] or self.policy["block_domains"]):
+            await context.route("**/*", self._route)
+        return context, await context.new_page()
+
+    async def _route(self, route):
+        """차단 대상 리소스 타입 / 광고 도메인 요청은 abort, 나머지는 그대로 진행"""
+        request = route.request
+        host = urlsplit(request.url).hostname or ""
+        if request.resource_type in self.policy["block_types"] or \
+                any(host == domain or host.endswith("." + domain) for domain in self.policy["block_domains"]):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def run(self, jobs, worker, stage):
+        """
+        jobs의 각 작업에 대해 worker(page, job)를 실행하고 성공한 (job, 결과) 목록을 반환.
+        재시도 후에도 실패한 작업은 on_error(stage, target, 오류 메시지)로 전달합니다.
+        """
+        queue = asyncio.Queue()
+        for job in jobs:
+            queue.put_nowait((job, 0))
+        results = []
+
+        async def consume():
+            context = page = None
+            generation = None
+            try:
+                while True:
+                    job, attempt = await queue.get()
+                    try:
+                        if page is None or page.is_closed() or generation != self.generation:
+                            await _close_quietly(context)
+                            generation = self.generation
+                            context, page = await self._open_page()
+                        results.append((job, await worker(page, job)))
+                    except Exception as e:
+                        print(f"error on {job[1]}: {e}")
+                        if not self.browser.is_connected():
+                            try:
+                                await self._restart(generation)
+                            except Exception as restart_error:
+                                # 워커가 task_done 없이 죽으면 queue.join()이 Lambda 타임아웃까지 끝나지 않으므로
+                                # 남은 작업을 큐에서 모두 꺼내 실패로 기록하고 워커 종료
+                                message = f"브라우저 재시작 실패: {restart_error}"
+                                print(f"❌ {message}")
+                                self._abandon(queue, stage, [job], message)
+                                return
+                        await _close_quietly(context)
+                        context = page = None
+                        if attempt < self.max_retries:
+                            queue.put_nowait((job, attempt + 1))
+                        elif self.on_error:
+                            self.on_error(stage, job[1], str(e))
+                    finally:
+                        queue.task_done()
+            finally:
+                await _close_quietly(context)
+
+        workers = [asyncio.create_task(consume()) for _ in range(min(self.size, max(queue.qsize(), 1)))]
+        await queue.join()
+        for task in workers:
+            task.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+        return results
+
+
+    def _abandon(self, queue, stage, jobs, message):
+        """큐에 남은 작업을 모두 꺼내(task_done) jobs와 함께 on_error로 전달"""
+        jobs = list(jobs)
+        while not queue.empty():
+            job, _ = queue.get_nowait()
+            queue.task_done()
+            jobs.append(job)
+        if self.on_error:
+            for job in jobs:
+                self.on_error(stage, job[1], message)
+
+
+async def _close_quietly(context):
+    if context is None:
+        return
+    try:
+        await context.close()
+    except Exception:
+        pass
@@ -1,136 +1,129 @@
-from playwright.sync_api import sync_playwright
 from datetime import datetime, timedelta
-import json
-import time
-import boto3
+import asyncio
+import itertools
 import os
-from multiprocessing import Manager, Process
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+from browser_pool import BrowserPool, resource_policy
+from fetch_engine import ChallengeDetected
+from list_fetcher import list_over_http, paginate
+from crawl_state import open_crawl_state, parse_count, plan_html_jobs
+from raw_writer import ShardedRawWriter
+from log_buffer import ErrorLogBuffer
+
+# 오류 로그 버퍼 (handler 종료 시 한 번에 전송)
+error_log = ErrorLogBuffer("clien_extract")
+
+# 이미지/미디어/폰트/CSS + 광고 도메인 차단, DOMContentLoaded까지만 대기
+RESOURCE_POLICY = resource_policy()
+
+# 게시글 URL (href: 목록에서 읽은 게시글 id / 경로)
+POST_URL = "https://www.clien.net{href}"
+
+LIST_URL = "https://www.clien.net/service/search?q={key}&sort=recency&p={page}"
+
+def parse_list_html(html, end_date):
+    """HTTP로 받은 검색 결과 페이지 파싱 → ([(게시글 경로, 댓글 수)], 기간 초과 여부)"""
+    tree = HTMLParser(html)
+    if tree.css_first("div.total_search") is None:
+        raise ChallengeDetected("div.total_search 없음")
+    rows = tree.css("div.total_search div.symph_row")
+    if not rows:
+        return [], True
 
-# 게시글 리스트 가져오기
-def get_list_from_url(keyword, end_date, result_href_list, keyword_dict):
     href_list = []
-    search_keywords = keyword_dict[keyword]
-    with sync_playwright() as p:
-        browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-        page = browser.new_page()
-        for key in search_keywords:
-            href_list.extend(get_inner_list(key, end_date, page))
+    for row in rows:
+        time_dt = datetime.strptime(row.css_first("span.timestamp").text(strip=True), "%Y-%m-%d %H:%M:%S")
+        if time_dt < end_date:
+            return href_list, True
+        reply = row.css_first("span.rSymph05")
+        comments = parse_count(reply.text(strip=True)) if reply else 0
+        href_list.append((row.css_first("a.subject_fixed").attributes["href"].split("?")[0], comments))
+    return href_list, False
 
-    result_href_list[keyword] = list(set(href_list))
+async def get_list_http(fetcher, key, end_date):
+    urls = (LIST_URL.format(key=key, page=page_number) for page_number in itertools.count(0))
+    return await paginate(fetcher, urls, parse_list_html, end_date)
 
-def get_inner_list(key, end_date, page):
+# 게시글 리스트 가져오기 (Playwright, JS 챌린지 발생 시에만 사용)
+async def get_inner_list(page, key, end_date):
     href_list = []
     page_number = 0
     while True:
         print(key, page_number)
-        url = f"https://www.clien.net/service/search?q={key}&sort=recency&p={page_number}"
-        page.goto(url)
+        url = LIST_URL.format(key=key, page=page_number)
+        await page.goto(url, wait_until=RESOURCE_POLICY["wait_until"])
         # 페이지가 완전히 로드될 때까지 대기
-        page.wait_for_selector("div.total_search")  #  요소가 로드될 때까지 기다림
+        await page.wait_for_selector("div.total_search")  #  요소가 로드될 때까지 기다림
         tbody = page.locator("div.total_search")
-        if tbody.count() == 0:  # tbody가 없으면 종료
+        if await tbody.count() == 0:  # tbody가 없으면 종료
             break
-        trs = tbody.locator("div.symph_row").all()
+        trs = await tbody.locator("div.symph_row").all()
         for tr in trs:
-            span_time = tr.locator("span.timestamp").inner_text().strip()
+            span_time = (await tr.locator("span.timestamp").inner_text()).strip()
             time_dt = datetime.strptime(span_time, "%Y-%m-%d %H:%M:%S")
             print(time_dt)
             if time_dt < end_date:
                 return href_list
-            a_href = tr.locator("a.subject_fixed").get_attribute("href").split("?")[0]
-            href_list.append(a_href)
+            a_href = (await tr.locator("a.subject_fixed").get_attribute("href")).split("?")[0]
+            href_list.append((a_href, None))  # 댓글 수를 모르면 항상 수집
         page_number += 1
-        time.sleep(0.75)
+        await asyncio.sleep(0.75)
 
     return href_list
 
-def get_htmls(keyword, hrefs, result, is_failed):
-    js = {}
-    failed_href_list = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-        page = browser.new_page()
-        for href in hrefs:
-            if not browser.is_connected():
-                browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-            if page.is_closed():
-                page = browser.new_page()
-            url = f'https://www.clien.net{href}'
-            try:
-                inner_js = {}
-                page.goto(url)
-                print(url)
-                html = page.locator("div.content_view").inner_html()
-                inner_js["keyword"] = keyword
-                inner_js["html"] = html
-                js[url] = inner_js
-
-            except Exception as e:
-                if is_failed:
-                    log_error("get_htmls", url, "페이지 가져올 수 없음")
-                    continue
-                else:
-                    failed_href_list.append(href)
-                    print("error on", url)
-                    continue
-            time.sleep(0.75)
-    if failed_href_list and not is_failed:
-        get_htmls(keyword, failed_href_list, result, True)
-    result.update(js)
-            
-def get_list(keywords, end_date, keyword_dict):
-    with Manager() as manager:
-        result_href_list = manager.dict()
-        processes = []
-        for keyword in keywords:
-            process = Process(target=get_list_from_url, args=(keyword, end_date, result_href_list, keyword_dict))
-            processes.append(process)
-            process.start()
-        for process in processes:
-            process.join()
-    
-        result_href_list = dict(result_href_list)
-    return result_href_list
+# 게시글 HTML 가져오기
+async def get_html(page, href):
+    url = POST_URL.format(href=href)
+    await page.goto(url, wait_until=RESOURCE_POLICY["wait_until"])
+    print(url)
+    html = await page.locator("div.content_view").inner_html()
+    await asyncio.sleep(0.75)
+    return url, html
+
+async def crawl(keywords, end_date, keyword_dict, state, writer):
+    """목록은 HTTP로 먼저 수집하고, 챌린지가 걸린 검색어와 게시글 HTML만 브라우저 풀로 처리"""
+    list_jobs = [(keyword, key) for keyword in keywords for key in keyword_dict[keyword]]
+    listed, fallback_jobs = await list_over_http(list_jobs, lambda fetcher, key: get_list_http(fetcher, key, end_date))
+
+    async with BrowserPool(on_error=log_error, policy=RESOURCE_POLICY) as pool:
+        if fallback_jobs:
+            listed += await pool.run(fallback_jobs, lambda page, job: get_inner_list(page, job[1], end_date), "get_list_from_url")
 
-def save_to_s3(data, bucket_name, folder_path, today, aws_region="ap-northeast-2"):
+        # {keyword: {href: 댓글 수}} — 수집 이력과 비교해 새 글 / 댓글 수가 바뀐 글만 가져오고, 나머지는 이전 샤드 레코드를 가리킴
+        result_href_list = {keyword: {} for keyword in keywords}
+        for (keyword, _), rows in listed:
+            result_href_list[keyword].update(rows)
+
+        async def fetch_and_write(page, job):
+            keyword, href = job
+            url, html = await get_html(page, href)
+            # 받는 즉시 샤드에 기록하고 메모리에는 모아두지 않음
+            shard = writer.write(url, keyword, html)
+            state.record(href, result_href_list[keyword][href], shard)
+
+        html_jobs = plan_html_jobs(result_href_list, state, writer, POST_URL)
+        await pool.run(html_jobs, fetch_and_write, "get_htmls")
+    return writer.records
+
+def save_to_s3(writer):
     """
-    데이터를 JSON 형식으로 변환하여 S3에 저장하는 함수.
+    마지막 샤드 업로드를 마치고 manifest에 이번 실행의 샤드를 추가하는 함수.
     """
-    object_key = f"{folder_path}/{today}.json"
-
     try:
-        s3_client = boto3.client("s3", region_name=aws_region)
-        json_data = json.dumps(data, ensure_ascii=False, indent=4)
-        
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=object_key,
-            Body=json_data,
-            ContentType="application/json"
-        )
-        print(f"✅ 업로드 성공: s3://{bucket_name}/{object_key}")
+        count = writer.close()
+        print(f"✅ 업로드 성공: {count}건 → s3://{writer.bucket}/{writer.base}")
         return True
     except Exception as e:
+        writer.abort()
         print(f"❌ 업로드 실패: {e}")
         return False
-    
+
 def log_error(stage, url, error_message):
-    LOGGING_LAMBDA_ARN = "arn:aws:lambda:ap-northeast-2:473551908409:function:crawling_log_lambda"
-    lambda_client = boto3.client('lambda')
-    log_payload = {
-        "status": "error",
-        "source": "clien_extract",
-        "stage": stage,
-        "url": url,
-        "error": error_message
-    }
-    lambda_client.invoke(
-        FunctionName=LOGGING_LAMBDA_ARN,
-        InvocationType="Event",
-        Payload=json.dumps(log_payload)
-    )
+    """오류를 버퍼에 모아 두고 handler 종료 시 한 번에 전송"""
+    error_log.log(stage, url, error_message)
 
 # 크롤링 실행
+@error_log.flush_after
 def handler(event, context):
     keywords = event["keywords"]
     S3_BUCKET_NAME = os.getenv("S3_BUCKET_NAME", "hmg5th-4-bucket")
@@ -145,24 +138,16 @@ def handler(event, context):
     end_date = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
     today = datetime.today().strftime("%Y-%m-%d")
     
+    state = open_crawl_state("clien", S3_BUCKET_NAME)
+    writer = ShardedRawWriter(S3_BUCKET_NAME, S3_FOLDER_PATH, today)
     try:
-        result_href_list = get_list(keywords, end_date, keyword_dict)
-    except:
-        result_href_list = get_list(keywords, end_date, keyword_dict) # retry
-    
-    with Manager() as manager:
-        result = manager.dict()
-        processes = []
-        for key, value in result_href_list.items():
-            process = Process(target=get_htmls, args=(key, value, result, False))
-            processes.append(process)
-            process.start()
-        for process in processes:
-            process.join()
-
-        result_dict = dict(result)
-
-    save_to_s3(result_dict, S3_BUCKET_NAME, S3_FOLDER_PATH, today)
+        asyncio.run(crawl(keywords, end_date, keyword_dict, state, writer))
+    except Exception:
+        writer.abort()
+        raise
+
+    if save_to_s3(writer):
+        state.save()
 
     return {"statusCode": 200, "body": "Scraping and upload completed successfully."}
 
@@ -0,0 +1,152 @@
+import gzip
+import os
+import re
+import sqlite3
+from datetime import datetime, timedelta
+import boto3
+
+STATE_PREFIX = "crawl_state/"
+RETENTION_DAYS = int(os.getenv("CRAWL_STATE_RETENTION_DAYS", "3"))
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+def parse_count(text):
+    """'[12]', '12', '12/3' 같은 댓글 수 표기에서 첫 숫자만 추출 (없으면 None)"""
+    match = re.search(r"\d[\d,]*", text or "")
+    return int(match.group().replace(",", "")) if match else None
+
+
+class CrawlState:
+    """
+    사이트별 게시글 수집 이력 {post_id: (last_seen, comments, shard)}.
+    shard는 게시글 HTML을 마지막으로 저장한 샤드의 S3 key이며, 이미 수집한 게시글 중 댓글 수가 그대로인 글은
+    (이전 날짜에 수집한 글이어도) 다시 가져오지 않고 그 샤드의 레코드를 오늘 manifest에서 가리킵니다.
+    """
+
+    def __init__(self, site):
+        self.site = site
+        self.entries = {}
+
+    def should_fetch(self, post_id, comments):
+        entry = self.entries.get(post_id)
+        if entry is None or comments is None:
+            return True
+        _, last_comments, shard = entry
+        # 저장 위치를 모르는 글(이전 형식의 이력)이거나 댓글 수가 바뀐 글만 수집
+        return not shard or last_comments != comments
+
+    def record(self, post_id, comments, shard):
+        self.entries[post_id] = (datetime.now().strftime(TIME_FORMAT), comments, shard)
+
+    def reuse(self, post_id):
+        """다시 가져오지 않은 글은 확인 시각만 갱신 (보관 기간 동안 이력 유지)"""
+        _, comments, shard = self.entries[post_id]
+        self.entries[post_id] = (datetime.now().strftime(TIME_FORMAT), comments, shard)
+
+    def prune(self):
+        cutoff = (datetime.now() - timedelta(days=RETENTION_DAYS)).strftime(TIME_FORMAT)
+        self.entries = {post_id: entry for post_id, entry in self.entries.items() if entry[0] >= cutoff}
+
+
+class S3CrawlState(CrawlState):
+    """post_id로 정렬된 gzip TSV 한 파일(crawl_state/{site}.tsv.gz)에 저장"""
+
+    def __init__(self, site, bucket):
+        super().__init__(site)
+        self.bucket = bucket
+        self.key = f"{STATE_PREFIX}{site}.tsv.gz"
+        self.s3 = boto3.client("s3")
+
+    def load(self):
+        try:
+            body = self.s3.get_object(Bucket=self.bucket, Key=self.key)["Body"].read()
+        except self.s3.exceptions.NoSuchKey:
+            print(f"ℹ️ 수집 이력 없음: {self.key}")
+            return self
+        for line in gzip.decompress(body).decode("utf-8").splitlines():
+            post_id, last_seen, comments, shard = line.split("\t")
+            # 이전 형식의 네 번째 컬럼(본문 해시)은 샤드 key가 아니므로 저장 위치를 모르는 것으로 처리
+            self.entries[post_id] = (last_seen, int(comments) if comments else None, shard if "/" in shard else "")
+        print(f"🗂️ 수집 이력 {len(self.entries)}건 로드: {self.key}")
+        return self
+
+    def save(self):
+        self.prune()
+        lines = [
+            f"{post_id}\t{last_seen}\t{'' if comments is None else comments}\t{shard}"
+            for post_id, (last_seen, comments, shard) in sorted(self.entries.items())
+        ]
+        self.s3.put_object(Bucket=self.bucket, Key=self.key,
+                           Body=gzip.compress("\n".join(lines).encode("utf-8")),
+                           ContentType="text/tab-separated-values", ContentEncoding="gzip")
+        print(f"✅ 수집 이력 {len(lines)}건 저장: {self.key}")
+
+
+class SQLiteCrawlState(CrawlState):
+    """로컬 실행용 SQLite 저장소 (CRAWL_STATE_DB 경로)"""
+
+    def __init__(self, site, path):
+        super().__init__(site)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawl_state ("
+            "site TEXT, post_id TEXT, last_seen TEXT, comments INTEGER, shard TEXT, "
+            "PRIMARY KEY (site, post_id))"
+        )
+        columns = [row[1] for row in self.conn.execute("PRAGMA table_info(crawl_state)")]
+        if "content_hash" in columns:
+            # 이전 형식(본문 해시 컬럼): 저장 위치를 모르므로 이력을 비우고 컬럼을 바꿈
+            with self.conn:
+                self.conn.execute("DROP TABLE crawl_state")
+                self.conn.execute(
+                    "CREATE TABLE crawl_state ("
+                    "site TEXT, post_id TEXT, last_seen TEXT, comments INTEGER, shard TEXT, "
+                    "PRIMARY KEY (site, post_id))"
+                )
+
+    def load(self):
+        rows = self.conn.execute(
+            "SELECT post_id, last_seen, comments, shard FROM crawl_state WHERE site = ?", (self.site,)
+        )
+        self.entries = {post_id: (last_seen, comments, shard) for post_id, last_seen, comments, shard in rows}
+        return self
+
+    def save(self):
+        self.prune()
+        with self.conn:
+            self.conn.execute("DELETE FROM crawl_state WHERE site = ?", (self.site,))
+            self.conn.executemany(
+                "INSERT INTO crawl_state VALUES (?, ?, ?, ?, ?)",
+                [(self.site, post_id, *entry) for post_id, entry in self.entries.items()],
+            )
+
+
+def open_crawl_state(site, bucket):
+    """CRAWL_STATE_DB가 설정되어 있으면 로컬 SQLite, 아니면 S3 이력 파일 사용"""
+    if os.getenv("CRAWL_STATE_DB"):
+        return SQLiteCrawlState(site, os.getenv("CRAWL_STATE_DB")).load()
+    return S3CrawlState(site, bucket).load()
+
+
+def plan_html_jobs(result_href_list, state, writer, post_url):
+    """
+    {keyword: {href: 댓글 수}}에서 새 글 / 댓글 수가 바뀐 글만 (keyword, href) 작업으로 변환.
+    여러 키워드 목록에 걸린 글은 한 번만 가져오고, 키워드 목록 순서상 마지막 키워드로 저장 (실행마다 같은 결과)
+    건너뛴 글은 이전 샤드의 레코드를 writer.refer로 오늘 manifest에 추가해 오늘 데이터에서 빠지지 않게 함
+    (post_url: href → 게시글 URL 형식 문자열, 예: "https://www.clien.net{href}")
+    """
+    listed = {}
+    for keyword, rows in result_href_list.items():
+        for href, comments in rows.items():
+            listed[href] = (keyword, comments)
+
+    jobs, skipped = [], 0
+    for href, (keyword, comments) in listed.items():
+        if state.should_fetch(href, comments):
+            jobs.append((keyword, href))
+        else:
+            writer.refer(post_url.format(href=href), keyword, state.entries[href][2])
+            state.reuse(href)
+            skipped += 1
+    print(f"🗂️ 수집 대상 {len(jobs)}건 (변경 없는 기수집 게시글 {skipped}건은 이전 샤드 레코드 사용)")
+    return jobs
@@ -1,156 +1,142 @@
-from playwright.sync_api import sync_playwright
 from datetime import datetime, timedelta
-import json
-import boto3
+import asyncio
 import os
-import time
-from multiprocessing import Manager, Process
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+from browser_pool import BrowserPool, resource_policy, AD_TRACKER_DOMAINS
+from fetch_engine import ChallengeDetected
+from list_fetcher import list_over_http, paginate
+from crawl_state import open_crawl_state, parse_count, plan_html_jobs
+from raw_writer import ShardedRawWriter
+from log_buffer import ErrorLogBuffer
+
+# 오류 로그 버퍼 (handler 종료 시 한 번에 전송)
+error_log = ErrorLogBuffer("dcinside_extract")
+
+# 댓글은 1st-party 스크립트가 XHR로 불러오므로 스크립트는 살리고, 광고 도메인(dcinside 자체 광고 서버 포함)만 차단
+RESOURCE_POLICY = resource_policy(block_domains=AD_TRACKER_DOMAINS + ("addc.dcinside.com",))
+
+# 게시글 URL (href: 목록에서 읽은 게시글 id / 경로)
+POST_URL = "https://gall.dcinside.com/board/view/?id=car_new1&no={href}"
+
+MAX_LIST_PAGES = 15
+
+LIST_URL = "https://gall.dcinside.com/board/lists/?id=car_new1&page={page}&search_pos=&s_type=search_subject_memo&s_keyword={key}"
+
+def parse_list_html(html, end_date):
+    """HTTP로 받은 갤러리 검색 페이지 파싱 → ([(게시글 번호, 댓글 수)], 기간 초과 여부)"""
+    tree = HTMLParser(html)
+    if tree.css_first("tbody.listwrap2") is None:
+        raise ChallengeDetected("tbody.listwrap2 없음")
+    rows = tree.css("tbody.listwrap2 tr.us-post")
+    if not rows:
+        return [], True
 
-# 게시글 리스트 가져오기
-def get_list_from_url(keyword, end_date, result_href_list, keyword_dict):
     href_list = []
-    search_keywords = keyword_dict[keyword]
-    with sync_playwright() as p:
-        browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-        page = browser.new_page()
-        for key in search_keywords:
-            if page.is_closed():
-                page = browser.new_page()
-            try:
-                href_list.extend(get_inner_list(key, end_date, page))
-            except Exception as e:
-                log_error("get_list_from_url", key, e)
-                continue
-    result_href_list[keyword] = list(set(href_list))
-
-def get_inner_list(key, end_date, page):
+    for row in rows:
+        td_time = row.css_first("td.gall_date").attributes["title"].strip()
+        if datetime.strptime(td_time, "%Y-%m-%d %H:%M:%S") < end_date:
+            print(td_time)
+            return href_list, True
+        reply = row.css_first("td.gall_tit span.reply_num")
+        comments = parse_count(reply.text(strip=True)) if reply else 0
+        href_list.append((row.css_first("td.gall_num").text(strip=True), comments))
+    return href_list, False
+
+async def get_list_http(fetcher, key, end_date):
+    urls = (LIST_URL.format(key=key, page=page_number) for page_number in range(1, MAX_LIST_PAGES + 1))
+    return await paginate(fetcher, urls, parse_list_html, end_date)
+
+# 게시글 리스트 가져오기 (Playwright, JS 챌린지 발생 시에만 사용)
+async def get_inner_list(page, key, end_date):
     href_list = []
     page_number = 1
-    while True:
-        if page_number > 15:
-            break
+    while page_number <= MAX_LIST_PAGES:
         print(key, page_number)
-        try:
-            url = f"https://gall.dcinside.com/board/lists/?id=car_new1&page={page_number}&search_pos=&s_type=search_subject_memo&s_keyword={key}"
-            page.goto(url, wait_until="load")
-
-            # 페이지가 완전히 로드될 때까지 대기
-            page.wait_for_selector("tbody.listwrap2")  # tbody 요소가 로드될 때까지 기다림
-            
-            tbody = page.locator("tbody.listwrap2")
-            if (tbody.count()) == 0:  # tbody가 없으면 종료
-                break
-            trs = tbody.locator("tr.us-post").all()
-            for tr in trs:
-                td_time = tr.locator("td.gall_date").get_attribute("title")  # 추가
-                td_time = td_time.strip()  # strip()은 동기 메서드이므로 문제가 되지 않음
-                dt_post = datetime.strptime(td_time, "%Y-%m-%d %H:%M:%S")
-                if dt_post < end_date:
-                    print(td_time)
-                    return href_list
-                td_href = tr.locator("td.gall_num").inner_text()  # 추가
-                td_href = td_href.strip()  # strip()은 동기 메서드이므로 문제가 되지 않음
-                href_list.append(td_href)
-        except Exception as e:
-            log_error("get_inner_list", url, "목록 가져올 수 없음")
-            return e
+        url = LIST_URL.format(key=key, page=page_number)
+        await page.goto(url, wait_until=RESOURCE_POLICY["wait_until"])
+
+        # 페이지가 완전히 로드될 때까지 대기
+        await page.wait_for_selector("tbody.listwrap2")  # tbody 요소가 로드될 때까지 기다림
+        
+        tbody = page.locator("tbody.listwrap2")
+        if (await tbody.count()) == 0:  # tbody가 없으면 종료
+            break
+        trs = await tbody.locator("tr.us-post").all()
+        for tr in trs:
+            td_time = (await tr.locator("td.gall_date").get_attribute("title")).strip()
+            dt_post = datetime.strptime(td_time, "%Y-%m-%d %H:%M:%S")
+            if dt_post < end_date:
+                print(td_time)
+                return href_list
+            td_href = (await tr.locator("td.gall_num").inner_text()).strip()
+            href_list.append((td_href, None))  # 댓글 수를 모르면 항상 수집
         page_number += 1
-        time.sleep(0.3)  # 비동기식으로 대기
+        await asyncio.sleep(0.3)
 
     return href_list
 
 # HTML 가져오기
-def get_htmls(keyword, hrefs, result, is_failed):
-    js = {}
-    failed_href_list = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-        page = browser.new_page()
-        
-        for href in hrefs:
-            try:
-                if page.is_closed():
-                    page = browser.new_page()
-                print(f"크롤링 시작: {href}")
-                inner_js = {}
-                url = f'https://gall.dcinside.com/board/view/?id=car_new1&no={href}'
-                
-                page.goto(url, timeout=60000)  # 타임아웃 설정
-                page.wait_for_selector("main.gallery_view", timeout=10000)
-                comment = page.locator("div.comment_count em.font_red").inner_text()
-                if comment != '0':
-                    page.wait_for_selector("div.cmt_nickbox")
-                main = page.locator("main.gallery_view")
-                html = main.locator("article").nth(1).inner_html()
-                
-                inner_js["keyword"] = keyword
-                inner_js["html"] = html
-                js[url] = inner_js
-
-                time.sleep(1)  # 부하 방지
-            except Exception as e:
-                if is_failed:
-                    log_error("get_htmls", href, "페이지 가져올 수 없음")
-                else:
-                    failed_href_list.append(href)
-                continue  # 다음 href로 넘어감
-        
-        browser.close()  # 브라우저 종료
-    if not is_failed:
-        get_htmls(keyword, failed_href_list, result, True)
-    result.update(js)
+async def get_html(page, href):
+    print(f"크롤링 시작: {href}")
+    url = POST_URL.format(href=href)
+    
+    await page.goto(url, wait_until=RESOURCE_POLICY["wait_until"], timeout=60000)  # 타임아웃 설정
+    await page.wait_for_selector("main.gallery_view", timeout=10000)
+    comment = await page.locator("div.comment_count em.font_red").inner_text()
+    if comment != '0':
+        await page.wait_for_selector("div.cmt_nickbox")
+    main = page.locator("main.gallery_view")
+    html = await main.locator("article").nth(1).inner_html()
+
+    await asyncio.sleep(1)  # 부하 방지
+    return url, html
+
+async def crawl(keywords, end_date, keyword_dict, state, writer):
+    """목록은 HTTP로 먼저 수집하고, 챌린지가 걸린 검색어와 게시글 HTML만 브라우저 풀로 처리"""
+    list_jobs = [(keyword, key) for keyword in keywords for key in keyword_dict[keyword]]
+    listed, fallback_jobs = await list_over_http(list_jobs, lambda fetcher, key: get_list_http(fetcher, key, end_date))
+
+    async with BrowserPool(on_error=log_error, policy=RESOURCE_POLICY) as pool:
+        if fallback_jobs:
+            listed += await pool.run(fallback_jobs, lambda page, job: get_inner_list(page, job[1], end_date), "get_list_from_url")
+        if list_jobs and not listed:
+            raise RuntimeError("목록 가져올 수 없음")
+
+        # {keyword: {href: 댓글 수}} — 수집 이력과 비교해 새 글 / 댓글 수가 바뀐 글만 가져오고, 나머지는 이전 샤드 레코드를 가리킴
+        result_href_list = {keyword: {} for keyword in keywords}
+        for (keyword, _), rows in listed:
+            result_href_list[keyword].update(rows)
+
+        async def fetch_and_write(page, job):
+            keyword, href = job
+            url, html = await get_html(page, href)
+            # 받는 즉시 샤드에 기록하고 메모리에는 모아두지 않음
+            shard = writer.write(url, keyword, html)
+            state.record(href, result_href_list[keyword][href], shard)
+
+        html_jobs = plan_html_jobs(result_href_list, state, writer, POST_URL)
+        await pool.run(html_jobs, fetch_and_write, "get_htmls")
+    return writer.records
 
 # S3에 저장
-def save_to_s3(data, bucket_name, folder_path, today, aws_region="ap-northeast-2"):
-    object_key = f"{folder_path}/{today}.json"
+def save_to_s3(writer):
+    """
+    마지막 샤드 업로드를 마치고 manifest에 이번 실행의 샤드를 추가하는 함수.
+    """
     try:
-        s3_client = boto3.client("s3", region_name=aws_region)
-        json_data = json.dumps(data, ensure_ascii=False, indent=4)
-        
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=object_key,
-            Body=json_data,
-            ContentType="application/json"
-        )
-
-        print(f"✅ 업로드 성공: s3://{bucket_name}/{object_key}")
+        count = writer.close()
+        print(f"✅ 업로드 성공: {count}건 → s3://{writer.bucket}/{writer.base}")
         return True
     except Exception as e:
+        writer.abort()
         print(f"❌ 업로드 실패: {e}")
         return False
 
 def log_error(stage, url, error_message):
-    LOGGING_LAMBDA_ARN = "arn:aws:lambda:ap-northeast-2:473551908409:function:crawling_log_lambda"
-    lambda_client = boto3.client('lambda')
-    log_payload = {
-        "status": "error",
-        "source": "clien_extract",
-        "stage": stage,
-        "url": url,
-        "error": error_message
-    }
-    lambda_client.invoke(
-        FunctionName=LOGGING_LAMBDA_ARN,
-        InvocationType="Event",
-        Payload=json.dumps(log_payload)
-    )
-
-def get_list(keywords, end_date, keyword_dict):
-    with Manager() as manager:
-        result_href_list = manager.dict()
-        processes = []
-        for keyword in keywords:
-            process = Process(target=get_list_from_url, args=(keyword, end_date, result_href_list, keyword_dict))
-            processes.append(process)
-            time.sleep(0.25)
-            process.start()
-        for process in processes:
-            process.join()
-    
-        result_href_list = dict(result_href_list)
-    return result_href_list
+    """오류를 버퍼에 모아 두고 handler 종료 시 한 번에 전송"""
+    error_log.log(stage, url, error_message)
 
+@error_log.flush_after
 def handler(event, context):
     keywords = event["keywords"]
     keyword_dict = os.getenv("KEYWORD_DICT",{'palisade': ["팰리", "펠리"],
@@ -163,28 +149,20 @@ def handler(event, context):
     yesterday = datetime.today() - timedelta(days=1)
     end_date = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
     today = datetime.today().strftime("%Y-%m-%d")
+    state = open_crawl_state("dcinside", S3_BUCKET_NAME)
+    writer = ShardedRawWriter(S3_BUCKET_NAME, S3_FOLDER_PATH, today)
     try:
-        result_href_list = get_list(keywords, end_date, keyword_dict)
-    except:
-        try: 
-            result_href_list = get_list(keywords, end_date, keyword_dict)
-        except:
-            return {"status":"Failed to get url list", "statusCode": 429, "body": "failed to get url list"}
-
-    with Manager() as manager:
-        result = manager.dict()
-        processes = []
-        for key, value in result_href_list.items():
-            process = Process(target=get_htmls, args=(key, value, result, False))
-            processes.append(process)
-            process.start()
-        for process in processes:
-            process.join()
-
-        result_dict = dict(result)
-
-    # 결과를 S3에 저장
-    save_to_s3(result_dict, S3_BUCKET_NAME, S3_FOLDER_PATH, today)
+        asyncio.run(crawl(keywords, end_date, keyword_dict, state, writer))
+    except RuntimeError:
+        writer.abort()
+        return {"status":"Failed to get url list", "statusCode": 429, "body": "failed to get url list"}
+    except Exception:
+        writer.abort()
+        raise
+
+    # 마지막 샤드와 manifest를 S3에 저장
+    if save_to_s3(writer):
+        state.save()
     return {"statusCode": 200, "body": "Scraping and upload completed successfully."}
 
 if __name__ == "__main__":
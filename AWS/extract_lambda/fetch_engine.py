@@ -0,0 +1,111 @@
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+import aiohttp
+
+# JS 챌린지(봇 차단) 페이지 판별 기준
+CHALLENGE_STATUSES = (403, 429, 503)
+CHALLENGE_MARKERS = ("cf-chl", "challenge-platform", "/cdn-cgi/challenge", "Just a moment", "잠시만 기다려")
+
+
+class ChallengeDetected(Exception):
+    """사이트가 정상 HTML 대신 JS 챌린지(봇 차단) 페이지를 반환한 경우"""
+
+
+class TokenBucket:
+    """호스트별 요청 속도를 제한하는 토큰 버킷 (rate: 초당 토큰, capacity: 최대 버스트)"""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = asyncio.Lock()
+
+    async def acquire(self):
+        async with self.lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class AsyncFetcher:
+    """
+    호스트별 동시 연결 수 제한과 토큰 버킷 속도 제한을 적용한 aiohttp 기반 비동기 HTTP 클라이언트.
+    고정 sleep 대신 버킷이 요청 간격을 조절하고, 실패 시 지수 백오프로 재시도합니다.
+    """
+
+    def __init__(self, headers=None, per_host_limit=4, rate=2.0, burst=4, timeout=10,
+                 max_retries=3, on_error=None):
+        self.headers = headers or {}
+        self.per_host_limit = per_host_limit
+        self.rate = rate
+        self.burst = burst
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.max_retries = max_retries
+        self.on_error = on_error
+        self.buckets = {}
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(limit_per_host=self.per_host_limit, ttl_dns_cache=300)
+        self.session = aiohttp.ClientSession(headers=self.headers, timeout=self.timeout, connector=connector)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+
+    def _bucket(self, url):
+        host = urlsplit(url).netloc
+        if host not in self.buckets:
+            self.buckets[host] = TokenBucket(self.rate, self.burst)
+        return self.buckets[host]
+
+    async def fetch(self, url, method="GET", data=None, detect_challenge=False):
+        """
+        응답 본문(str)을 반환. 최대 재시도 후에도 실패하면 on_error를 호출하고 None 반환.
+        detect_challenge=True이면 챌린지 페이지를 재시도하지 않고 바로 ChallengeDetected를 발생시킵니다.
+        """
+        bucket = self._bucket(url)
+        for attempt in range(self.max_retries):
+            await bucket.acquire()
+            try:
+                async with self.session.request(method, url, data=data) as response:
+                    if detect_challenge and response.status in CHALLENGE_STATUSES:
+                        raise ChallengeDetected(f"상태 코드 {response.status}: {url}")
+                    if response.status == 200:
+                        text = decode_body(await response.read(), response.charset)
+                        if detect_challenge and is_challenge(text):
+                            raise ChallengeDetected(f"챌린지 페이지: {url}")
+                        return text
+                    print(f"⚠️ 요청 실패 {attempt + 1}/{self.max_retries} (상태 코드: {response.status})")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                print(f"⚠️ 요청 오류 {attempt + 1}/{self.max_retries}: {str(e)}")
+            await asyncio.sleep(2 ** attempt)
+        if self.on_error:
+            self.on_error("request_with_retries", url, "최대 재시도 횟수 초과")
+        return None
+
+
+def is_challenge(text):
+    """본문 앞부분에 챌린지 스크립트 흔적이 있는지 확인"""
+    head = text[:4096]
+    return any(marker in head for marker in CHALLENGE_MARKERS)
+
+
+def decode_body(body, charset=None):
+    """헤더 charset → utf-8 → cp949 순으로 디코딩 (requests의 apparent_encoding 대체)"""
+    for encoding in (charset, "utf-8", "cp949"):
+        if not encoding:
+            continue
+        try:
+            return body.decode(encoding)
+        except (UnicodeDecodeError, LookupError):
+            continue
+    return body.decode("utf-8", errors="replace")
@@ -1,141 +1,151 @@
-from playwright.sync_api import sync_playwright
 from datetime import datetime, timedelta
-import json
-import time
-import boto3
+import asyncio
+import itertools
 import os
-from multiprocessing import Manager, Process
+from selectolax.lexbor import LexborHTMLParser as HTMLParser
+from browser_pool import BrowserPool, resource_policy
+from fetch_engine import ChallengeDetected
+from list_fetcher import list_over_http, paginate
+from crawl_state import open_crawl_state, parse_count, plan_html_jobs
+from raw_writer import ShardedRawWriter
+from log_buffer import ErrorLogBuffer
 
-# 게시글 리스트 가져오기
-def get_list_from_url(keyword, end_date, result_href_list, keyword_dict):
-    href_list = []
-    search_keywords = keyword_dict[keyword]
+# 오류 로그 버퍼 (handler 종료 시 한 번에 전송)
+error_log = ErrorLogBuffer("fmkorea_extract")
+
+# 이미지/미디어/폰트/CSS + 광고 도메인 차단, DOMContentLoaded까지만 대기
+RESOURCE_POLICY = resource_policy()
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-        page = browser.new_page()
-        for key in search_keywords:
-            href_list.extend(get_inner_list(key, end_date, page))
+# 게시글 URL (href: 목록에서 읽은 게시글 id / 경로)
+POST_URL = "https://www.fmkorea.com/{href}"
 
-    result_href_list[keyword] = list(set(href_list))
+LIST_URL = "https://www.fmkorea.com/search.php?mid=car&search_keyword={key}&search_target=title_content&page={page}"
 
-def get_inner_list(key, end_date, page):
+def parse_list_date(date, today):
+    """목록의 작성일: 오늘 글은 'HH:MM', 이전 글은 'YYYY.MM.DD'"""
+    try:
+        return datetime.strptime(date, "%Y.%m.%d")
+    except ValueError:
+        return datetime.combine(today, datetime.strptime(date, "%H:%M").time())
+
+def parse_list_html(html, end_date):
+    """HTTP로 받은 검색 결과 페이지 파싱 → ([(document_srl, 댓글 수)], 기간 초과 여부)"""
+    tree = HTMLParser(html)
+    if tree.css_first("tbody") is None:
+        raise ChallengeDetected("tbody 없음")
+    rows = [row for row in tree.css("tbody tr") if row.css_first("td.time") and row.css_first("a.hx")]
+    if not rows:
+        return [], True
+
+    href_list = []
+    today = datetime.now()
+    for row in rows:
+        if parse_list_date(row.css_first("td.time").text(strip=True), today) < end_date:
+            return href_list, True
+        href = row.css_first("a.hx").attributes.get("href")
+        if href and "document_srl=" in href:
+            reply = row.css_first("a.replyNum")
+            comments = parse_count(reply.text(strip=True)) if reply else 0
+            href_list.append((href.split("document_srl=")[1].split("&")[0], comments))
+    return href_list, False
+
+async def get_list_http(fetcher, key, end_date):
+    urls = (LIST_URL.format(key=key, page=page_number) for page_number in itertools.count(1))
+    return await paginate(fetcher, urls, parse_list_html, end_date)
+
+# 게시글 리스트 가져오기 (Playwright, JS 챌린지 발생 시에만 사용)
+async def get_inner_list(page, key, end_date):
     href_list = []
     page_number = 1
     today = datetime.now()
     while True:
-        url = f"https://www.fmkorea.com/search.php?mid=car&search_keyword={key}&search_target=title_content&page={page_number}"
-        page.goto(url)
+        url = LIST_URL.format(key=key, page=page_number)
+        await page.goto(url, wait_until=RESOURCE_POLICY["wait_until"])
 
         # 페이지가 완전히 로드될 때까지 대기
-        page.wait_for_selector("tbody")  # tbody 요소가 로드될 때까지 기다림
+        await page.wait_for_selector("tbody")  # tbody 요소가 로드될 때까지 기다림
         
         tbody = page.locator("tbody")
-        if tbody.count() == 0:  # tbody가 없으면 종료
+        if await tbody.count() == 0:  # tbody가 없으면 종료
             break
-        page.wait_for_selector("td.time")
-        rows_time = tbody.locator("td.time").all()
-        rows_href = tbody.locator("a.hx").all()
+        await page.wait_for_selector("td.time")
+        rows_time = await tbody.locator("td.time").all()
+        rows_href = await tbody.locator("a.hx").all()
         for row_time, row_href in zip(rows_time, rows_href):
-            date = row_time.inner_text().strip()
+            date = (await row_time.inner_text()).strip()
             print(date)
-            try:
-                dt_post = datetime.strptime(date, "%Y.%m.%d")
-            except:
-                dt_post = datetime.strptime(date,"%H:%M")
-                dt_post = datetime.combine(today, dt_post.time())
+            dt_post = parse_list_date(date, today)
             if dt_post < end_date:
                 return href_list
-            href = row_href.get_attribute("href")
+            href = await row_href.get_attribute("href")
             if href and "document_srl=" in href:
                 href = href.split("document_srl=")[1].split("&")[0]
-                href_list.append(href)
+                href_list.append((href, None))  # 댓글 수를 모르면 항상 수집
         page_number += 1
-        time.sleep(0.3)
+        await asyncio.sleep(0.3)
 
     return href_list
 
-def get_htmls(keyword, hrefs, result, is_failed):
-    js = {}
-    failed_href_list = []
-    with sync_playwright() as p:
-        browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-        page = browser.new_page()
-        for href in hrefs:
-            try:
-                if not browser.is_connected():
-                    browser = p.chromium.launch(args=["--disable-gpu", "--single-process"], headless=True)
-                if page.is_closed():
-                    page = browser.new_page()
-                print(href)
-                inner_js = {}
-                url = f'https://www.fmkorea.com/{href}'
-                page.goto(url)
-                page.wait_for_selector("div.rd_nav_style2")
-
-                # 해당 요소가 존재하는지 확인
-                if page.locator("div.rd_nav_style2").count() > 0:
-                    html = page.locator("div.rd_nav_style2").inner_html()
-                else:
-                    html = "Element not found"
-
-                inner_js["keyword"] = keyword
-                inner_js["html"] = html
-                js[url] = inner_js
-                time.sleep(0.5)
-            except Exception as e:
-                if is_failed:
-                    log_error("get_htmls", href, e)
-                    continue
-                else:
-                    failed_href_list.append(href)
-                    print("error on", href)
-                    continue
-    if failed_href_list and not is_failed:
-        get_htmls(keyword, failed_href_list, result, True)
-    result.update(js)
-
-def save_to_s3(data, bucket_name, folder_path, today, aws_region="ap-northeast-2"):
+# 게시글 HTML 가져오기
+async def get_html(page, href):
+    print(href)
+    url = POST_URL.format(href=href)
+    await page.goto(url, wait_until=RESOURCE_POLICY["wait_until"])
+    await page.wait_for_selector("div.rd_nav_style2")
+
+    # 해당 요소가 존재하는지 확인
+    nav = page.locator("div.rd_nav_style2")
+    if await nav.count() > 0:
+        html = await nav.inner_html()
+    else:
+        html = "Element not found"
+    await asyncio.sleep(0.5)
+    return url, html
+
+async def crawl(keywords, end_date, keyword_dict, state, writer):
+    """목록은 HTTP로 먼저 수집하고, 챌린지가 걸린 검색어와 게시글 HTML만 브라우저 풀로 처리"""
+    list_jobs = [(keyword, key) for keyword in keywords for key in keyword_dict[keyword]]
+    listed, fallback_jobs = await list_over_http(list_jobs, lambda fetcher, key: get_list_http(fetcher, key, end_date))
+
+    async with BrowserPool(on_error=log_error, policy=RESOURCE_POLICY) as pool:
+        if fallback_jobs:
+            listed += await pool.run(fallback_jobs, lambda page, job: get_inner_list(page, job[1], end_date), "get_list_from_url")
+
+        # {keyword: {href: 댓글 수}} — 수집 이력과 비교해 새 글 / 댓글 수가 바뀐 글만 가져오고, 나머지는 이전 샤드 레코드를 가리킴
+        result_href_list = {keyword: {} for keyword in keywords}
+        for (keyword, _), rows in listed:
+            result_href_list[keyword].update(rows)
+
+        async def fetch_and_write(page, job):
+            keyword, href = job
+            url, html = await get_html(page, href)
+            # 받는 즉시 샤드에 기록하고 메모리에는 모아두지 않음
+            shard = writer.write(url, keyword, html)
+            state.record(href, result_href_list[keyword][href], shard)
+
+        html_jobs = plan_html_jobs(result_href_list, state, writer, POST_URL)
+        await pool.run(html_jobs, fetch_and_write, "get_htmls")
+    return writer.records
+
+def save_to_s3(writer):
     """
-    데이터를 JSON 형식으로 변환하여 S3에 저장하는 함수.
+    마지막 샤드 업로드를 마치고 manifest에 이번 실행의 샤드를 추가하는 함수.
     """
-    object_key = f"{folder_path}/{today}.json"
-
     try:
-        s3_client = boto3.client("s3", region_name=aws_region)
-        json_data = json.dumps(data, ensure_ascii=False, indent=4)
-        
-        s3_client.put_object(
-            Bucket=bucket_name,
-            Key=object_key,
-            Body=json_data,
-            ContentType="application/json"
-        )
-
-        print(f"✅ 업로드 성공: s3://{bucket_name}/{object_key}")
+        count = writer.close()
+        print(f"✅ 업로드 성공: {count}건 → s3://{writer.bucket}/{writer.base}")
         return True
     except Exception as e:
+        writer.abort()
         print(f"❌ 업로드 실패: {e}")
         return False
 
 def log_error(stage, url, error_message):
-    LOGGING_LAMBDA_ARN = "arn:aws:lambda:ap-northeast-2:473551908409:function:crawling_log_lambda"
-    lambda_client = boto3.client('lambda')
-
-    log_payload = {
-        "status": "error",
-        "source": "fmkorea_extract",
-        "stage": stage,
-        "url": url,
-        "error": error_message
-    }
-    lambda_client.invoke(
-        FunctionName=LOGGING_LAMBDA_ARN,
-        InvocationType="Event",
-        Payload=json.dumps(log_payload)
-    )
+    """오류를 버퍼에 모아 두고 handler 종료 시 한 번에 전송"""
+    error_log.log(stage, url, error_message)
 
 # 크롤링 실행
+@error_log.flush_after
 def handler(event, context):
     keywords = event["keywords"]
     keyword_dict = os.getenv("KEYWORD_DICT", {'palisade': ["팰리", "펠리"],
@@ -149,32 +159,16 @@ def handler(event, context):
     end_date = yesterday.replace(hour=0, minute=0, second=0, microsecond=0)
     today = datetime.today().strftime("%Y-%m-%d")
 
-    with Manager() as manager:
-        result_href_list = manager.dict()
-        processes = []
-        for keyword in keywords:
-            process = Process(target=get_list_from_url, args=(keyword, end_date, result_href_list, keyword_dict))
-            processes.append(process)
-            process.start()
-            time.sleep(0.3)
-        for process in processes:
-            process.join()
-    
-        result_href_list = dict(result_href_list)
-
-    with Manager() as manager:
-        result = manager.dict()
-        processes = []
-        for key, value in result_href_list.items():
-            process = Process(target=get_htmls, args=(key, value, result, False))
-            processes.append(process)
-            process.start()
-        for process in processes:
-            process.join()
-
-        result_dict = dict(result)
-
-    save_to_s3(result_dict, S3_BUCKET_NAME, S3_FOLDER_PATH, today)
+    state = open_crawl_state("fmkorea", S3_BUCKET_NAME)
+    writer = ShardedRawWriter(S3_BUCKET_NAME, S3_FOLDER_PATH, today)
+    try:
+        asyncio.run(crawl(keywords, end_date, keyword_dict, state, writer))
+    except Exception:
+        writer.abort()
+        raise
+
+    if save_to_s3(writer):
+        state.save()
 
     return {"statusCode": 200, "body": "Scraping and upload completed successfully."}
 
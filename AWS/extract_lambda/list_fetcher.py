@@ -0,0 +1,52 @@
+import asyncio
+import os
+from fetch_engine import AsyncFetcher, ChallengeDetected
+
+# 목록 페이지 요청용 브라우저 유사 헤더
+BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/132.0.0.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8",
+}
+
+LIST_CONCURRENCY = int(os.getenv("LIST_CONCURRENCY", "4"))
+LIST_REQUEST_RATE = float(os.getenv("LIST_REQUEST_RATE", "2"))
+
+
+async def paginate(fetcher, urls, parse_page, end_date):
+    """
+    목록 URL을 순서대로 요청해 parse_page(html, end_date) -> (hrefs, 종료 여부)로 파싱.
+    응답이 없거나 챌린지 페이지면 ChallengeDetected를 발생시켜 Playwright 경로로 넘깁니다.
+    """
+    href_list = []
+    for url in urls:
+        print(url)
+        text = await fetcher.fetch(url, detect_challenge=True)
+        if text is None:
+            raise ChallengeDetected(f"응답 없음: {url}")
+        hrefs, done = parse_page(text, end_date)
+        href_list.extend(hrefs)
+        if done:
+            break
+    return href_list
+
+
+async def list_over_http(list_jobs, list_keyword):
+    """
+    (keyword, 검색어) 작업을 브라우저 없이 HTTP로 수집.
+    list_keyword(fetcher, 검색어)가 실패한 작업은 Playwright로 다시 수집하도록 따로 반환합니다.
+    반환값: ([(job, hrefs)], [fallback job])
+    """
+    listed, fallback_jobs = [], []
+
+    async def run(job):
+        try:
+            listed.append((job, await list_keyword(fetcher, job[1])))
+        except Exception as e:
+            print(f"⚠️ HTTP 목록 수집 실패 → Playwright 전환 ({job[1]}): {e}")
+            fallback_jobs.append(job)
+
+    async with AsyncFetcher(headers=BROWSER_HEADERS, per_host_limit=LIST_CONCURRENCY,
+                            rate=LIST_REQUEST_RATE, burst=LIST_CONCURRENCY) as fetcher:
+        await asyncio.gather(*(run(job) for job in list_jobs))
+    return listed, fallback_jobs
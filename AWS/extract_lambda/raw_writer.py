@@ -0,0 +1,125 @@
+import gzip
+import io
+import json
+import os
+import uuid
+from datetime import datetime
+import boto3
+
+# 샤드 하나의 목표 크기(압축 후)와 multipart 파트 크기 (S3 최소 파트 크기는 5MB)
+SHARD_TARGET_BYTES = int(os.getenv("RAW_SHARD_MB", "32")) * 1024 * 1024
+PART_BYTES = 8 * 1024 * 1024
+MANIFEST_NAME = "manifest.json"
+
+
+class ShardedRawWriter:
+    """
+    수집한 게시글을 gzip JSON Lines 샤드로 바로 S3에 multipart 업로드하는 writer.
+    - 샤드: {prefix}/{date}/{run_id}-{n}.jsonl.gz, 한 줄에 {"url", "keyword", "html"[, "rank"]} 하나
+      (같은 URL을 한 실행에서 여러 번 쓰면 읽을 때 rank가 높은 레코드, 같으면 나중 레코드를 사용)
+    - manifest: {prefix}/{date}/manifest.json, 같은 날 이전 실행의 샤드 뒤에 이번 실행 샤드를 추가
+      다시 가져오지 않은 게시글은 이전 샤드를 가리키는 항목 {"key": 이전 샤드, "run_id", "urls": {url: keyword}}으로 추가
+    메모리에는 업로드 전 파트 하나(최대 PART_BYTES)만 유지합니다.
+    """
+
+    def __init__(self, bucket, prefix, day, aws_region="ap-northeast-2"):
+        self.s3 = boto3.client("s3", region_name=aws_region)
+        self.bucket = bucket
+        self.base = f"{prefix.rstrip('/')}/{day}/"
+        self.run_id = f"{datetime.utcnow().strftime('%H%M%S')}-{uuid.uuid4().hex[:6]}"
+        self.shards = []
+        self.records = 0
+        self.shard = None
+        # {이전 샤드 key: {url: keyword}}
+        self.references = {}
+        self.referenced = 0
+
+    def write(self, url, keyword, html, rank=None):
+        """레코드 하나를 현재 샤드에 기록하고 그 샤드의 S3 key를 반환 (수집 이력에 저장 위치로 기록)"""
+        if self.shard is None:
+            self._open_shard()
+        record = {"url": url, "keyword": keyword, "html": html}
+        if rank is not None:
+            record["rank"] = rank
+        line = json.dumps(record, ensure_ascii=False) + "\n"
+        self.shard["gzip"].write(line.encode("utf-8"))
+        self.shard["records"] += 1
+        self.records += 1
+        if self.shard["buffer"].tell() >= PART_BYTES:
+            self._upload_part()
+        key = self.shard["key"]
+        if self.shard["uploaded"] + self.shard["buffer"].tell() >= SHARD_TARGET_BYTES:
+            self._close_shard()
+        return key
+
+    def refer(self, url, keyword, shard_key):
+        """이전에 shard_key 샤드에 저장한 게시글을 다시 받지 않고 오늘 데이터에 포함 (manifest에 위치만 추가)"""
+        self.references.setdefault(shard_key, {})[url] = keyword
+        self.referenced += 1
+
+    def close(self):
+        """마지막 샤드를 마무리하고 manifest를 갱신. 이번 실행에서 쓴 레코드 수를 반환"""
+        if self.shard is not None:
+            self._close_shard()
+        if self.shards or self.references:
+            self._update_manifest()
+        return self.records
+
+    def abort(self):
+        if self.shard is not None:
+            self.s3.abort_multipart_upload(Bucket=self.bucket, Key=self.shard["key"], UploadId=self.shard["upload_id"])
+            self.shard = None
+
+    def _open_shard(self):
+        key = f"{self.base}{self.run_id}-{len(self.shards):04d}.jsonl.gz"
+        upload = self.s3.create_multipart_upload(Bucket=self.bucket, Key=key, ContentType="application/x-ndjson",
+                                                 ContentEncoding="gzip")
+        buffer = io.BytesIO()
+        self.shard = {
+            "key": key,
+            "upload_id": upload["UploadId"],
+            "buffer": buffer,
+            "gzip": gzip.GzipFile(fileobj=buffer, mode="wb"),
+            "parts": [],
+            "uploaded": 0,
+            "records": 0,
+        }
+
+    def _upload_part(self):
+        shard = self.shard
+        data = shard["buffer"].getvalue()
+        if not data:
+            return
+        part_number = len(shard["parts"]) + 1
+        response = self.s3.upload_part(Bucket=self.bucket, Key=shard["key"], UploadId=shard["upload_id"],
+                                       PartNumber=part_number, Body=data)
+        shard["parts"].append({"ETag": response["ETag"], "PartNumber": part_number})
+        shard["uploaded"] += len(data)
+        shard["buffer"].seek(0)
+        shard["buffer"].truncate()
+
+    def _close_shard(self):
+        shard = self.shard
+        shard["gzip"].close()
+        self._upload_part()
+        self.s3.complete_multipart_upload(Bucket=self.bucket, Key=shard["key"], UploadId=shard["upload_id"],
+                                          MultipartUpload={"Parts": shard["parts"]})
+        self.shards.append({"key": shard["key"], "records": shard["records"], "bytes": shard["uploaded"],
+                            "run_id": self.run_id})
+        print(f"✅ 샤드 업로드: s3://{self.bucket}/{shard['key']} ({shard['records']}건, {shard['uploaded']} bytes)")
+        self.shard = None
+
+    def _update_manifest(self):
+        key = f"{self.base}{MANIFEST_NAME}"
+        try:
+            manifest = json.loads(self.s3.get_object(Bucket=self.bucket, Key=key)["Body"].read())
+        except self.s3.exceptions.NoSuchKey:
+            manifest = {"format": "jsonl.gz", "shards": []}
+        manifest["shards"].extend(self.shards)
+        manifest["shards"].extend({"key": shard_key, "run_id": self.run_id, "urls": urls}
+                                  for shard_key, urls in self.references.items())
+        manifest["updated_at"] = datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        self.s3.put_object(Bucket=self.bucket, Key=key, Body=json.dumps(manifest, ensure_ascii=False, indent=2),
+                           ContentType="application/json")
+        print(f"✅ manifest 갱신: s3://{self.bucket}/{key} (샤드 {len(manifest['shards'])}개, "
+              f"이전 샤드 레코드 사용 {self.referenced}건)")
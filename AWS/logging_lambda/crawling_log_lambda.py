@@ -1,20 +1,114 @@
 import json
 import requests
 import os
+import time
 from datetime import datetime, timedelta
+from requests.adapters import HTTPAdapter
 
 # 환경 변수에서 Slack Webhook URL 가져오기 (AWS Lambda 환경 변수에 등록 필수)
 SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
 
+# 묶음 로그 요약 시 Slack 메시지에 표시할 최대 (위치, 단계) 그룹 수
+MAX_SUMMARY_EVENTS = int(os.getenv("MAX_SUMMARY_EVENTS", "20"))
+
+# 집계 모드: 0이면 받은 즉시 전송, 양수면 첫 이벤트 이후 이 시간(초) 동안 모아 다이제스트 하나로 전송
+ALERT_WINDOW_SECONDS = int(os.getenv("ALERT_WINDOW_SECONDS", "0"))
+MAX_SAMPLES = 3
+
+# 전송 실패로 보관 중인 알림이 웜 컨테이너에 계속 쌓이지 않도록 하는 한도
+# 그룹 수가 MAX_PENDING_GROUPS를 넘으면 새 (위치, 단계)는 "보관 한도 초과" 그룹 하나로 합산하고,
+# 처음 보관한 지 PENDING_MAX_AGE_SECONDS가 지난 그룹은 버림
+MAX_PENDING_GROUPS = int(os.getenv("MAX_PENDING_GROUPS", "100"))
+PENDING_MAX_AGE_SECONDS = int(os.getenv("PENDING_MAX_AGE_SECONDS", "3600"))
+OVERFLOW_KEY = ("기타", "보관 한도 초과")
+
+# 웜 스타트 간에 재사용되는 Webhook 세션 (연결 풀 유지, 연결 실패는 재시도)
+session = requests.Session()
+session.mount("https://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=2))
+session.mount("http://", HTTPAdapter(pool_connections=1, pool_maxsize=2, max_retries=2))
+
+# 집계 중인 알림 {(source, stage): 그룹}, 첫 이벤트를 받은 시각
+pending = {}
+window_started = None
+
+
+def now_kst():
+    return (datetime.utcnow() + timedelta(hours=9)).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def to_events(log_data):
+    """단일 로그 / 묶음 로그(ErrorLogBuffer)를 같은 이벤트 목록 형태로 변환"""
+    if log_data.get("events"):
+        return [dict(event, source=event.get("source", log_data.get("source"))) for event in log_data["events"]]
+    url = log_data.get("url")
+    return [{
+        "source": log_data.get("source", "알 수 없음"),
+        "stage": log_data.get("stage", "알 수 없음"),
+        "keyword": log_data.get("keyword"),
+        "error": log_data.get("error", "No details"),
+        "count": 1,
+        "urls": [url] if url else [],
+        "first_seen": log_data.get("timestamp", now_kst()),
+        "last_seen": log_data.get("timestamp", now_kst()),
+    }]
+
+
+def add_events(events):
+    """이벤트를 (source, stage) 그룹에 합산 (오류 메시지 / URL은 예시로 최대 MAX_SAMPLES개)"""
+    global window_started
+    now = time.time()
+    if window_started is None:
+        window_started = now
+    for event in events:
+        key = (event.get("source", "알 수 없음"), event.get("stage", "알 수 없음"))
+        if key not in pending and len(pending) >= MAX_PENDING_GROUPS:
+            key = OVERFLOW_KEY
+        group = pending.get(key)
+        if group is None:
+            group = pending[key] = {
+                "source": key[0], "stage": key[1], "count": 0, "errors": [], "urls": [],
+                "first_seen": event.get("first_seen", ""), "last_seen": "", "held_since": now,
+            }
+        # 전송 실패로 되돌려 둔 그룹은 처음 보관한 시각을 유지 (PENDING_MAX_AGE_SECONDS 기준)
+        group["held_since"] = min(group["held_since"], event.get("held_since", now))
+        group["count"] += event.get("count", 1)
+        group["first_seen"] = min(group["first_seen"], event.get("first_seen", group["first_seen"]))
+        group["last_seen"] = max(group["last_seen"], event.get("last_seen", ""))
+        # 전송 실패로 되돌려 둔 그룹은 errors 목록을 그대로 가지고 있음
+        for error in event.get("errors") or [event.get("error", "No details")]:
+            if error not in group["errors"] and len(group["errors"]) < MAX_SAMPLES:
+                group["errors"].append(error)
+        for url in event.get("urls", []):
+            if url not in group["urls"] and len(group["urls"]) < MAX_SAMPLES:
+                group["urls"].append(url)
+
+
+def expire_pending():
+    """처음 보관한 지 PENDING_MAX_AGE_SECONDS가 지난 그룹을 버리고 버린 건수를 반환"""
+    global pending, window_started
+    cutoff = time.time() - PENDING_MAX_AGE_SECONDS
+    expired = [group for group in pending.values() if group["held_since"] < cutoff]
+    if not expired:
+        return 0
+    pending = {key: group for key, group in pending.items() if group["held_since"] >= cutoff}
+    if not pending:
+        window_started = None
+    dropped = sum(group["count"] for group in expired)
+    print(f"⚠️ 보관 기간이 지난 알림 {dropped}건({len(expired)}개 단계) 폐기")
+    return dropped
+
+
+def take_digest():
+    """집계 중인 그룹을 꺼내고 윈도우를 초기화"""
+    global pending, window_started
+    groups = list(pending.values())
+    pending, window_started = {}, None
+    return groups
 
-def send_slack_alert(log_data):
-    """Slack Webhook으로 오류 알림 전송"""
-    if not SLACK_WEBHOOK_URL:
-        print("❌ Webhook URL이 설정되지 않았습니다.")
-        return {"status": "failed", "error": "Missing SLACK_WEBHOOK_URL"}
 
-    # Slack 메시지 구성
-    message = (
+def format_alert(log_data):
+    """단일 오류 로그 → Slack 메시지"""
+    return (
         f"🚨 *오류 발생!*\n"
         f"- 발생 시간: {log_data.get('timestamp', (datetime.utcnow() + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M'))}\n"
         f"- 위치: `{log_data.get('source', '알 수 없음')}`\n"
@@ -24,12 +118,45 @@ def send_slack_alert(log_data):
         f"- 오류 메시지: ```{log_data.get('error', 'No details')}```\n"
     )
 
+
+def format_digest(groups):
+    """
+    (source, stage) 그룹 목록 → Slack 메시지 하나로 요약.
+    건수가 많은 순으로 MAX_SUMMARY_EVENTS개 그룹까지 표시합니다.
+    """
+    groups = sorted(groups, key=lambda group: group["count"], reverse=True)
+    total = sum(group["count"] for group in groups)
+    lines = [
+        f"🚨 *오류 {total}건 발생!* ({len(groups)}개 단계)",
+        f"- 기간: {min(group['first_seen'] for group in groups)} ~ {max(group['last_seen'] for group in groups)}",
+    ]
+    for group in groups[:MAX_SUMMARY_EVENTS]:
+        lines.append(f"• `{group['source']}` / `{group['stage']}` ×{group['count']}: {' | '.join(group['errors'])}")
+        if group["urls"]:
+            lines.append(f"    예) {', '.join(group['urls'])}")
+    if len(groups) > MAX_SUMMARY_EVENTS:
+        lines.append(f"외 {len(groups) - MAX_SUMMARY_EVENTS}개 단계 "
+                     f"({sum(group['count'] for group in groups[MAX_SUMMARY_EVENTS:])}건)")
+    return "\n".join(lines) + "\n"
+
+
+def post_to_slack(message):
+    """Slack Webhook으로 메시지 전송"""
+    if not SLACK_WEBHOOK_URL:
+        print("❌ Webhook URL이 설정되지 않았습니다.")
+        return {"status": "failed", "error": "Missing SLACK_WEBHOOK_URL"}
+
     payload = {
         "text": message
     }
 
     headers = {"Content-Type": "application/json"}
-    response = requests.post(SLACK_WEBHOOK_URL, data=json.dumps(payload), headers=headers)
+    try:
+        response = session.post(SLACK_WEBHOOK_URL, data=json.dumps(payload), headers=headers, timeout=10)
+    except requests.RequestException as e:
+        # 연결 실패 / 시간 초과도 실패 결과로 반환 (호출한 쪽이 꺼낸 그룹을 되돌릴 수 있도록)
+        print(f"❌ Slack 메시지 전송 실패: {e}")
+        return {"status": "failed", "error": str(e)}
 
     if response.status_code == 200:
         print("✅ Slack 알림 전송 성공!")
@@ -38,15 +165,50 @@ def send_slack_alert(log_data):
         print(f"❌ Slack 메시지 전송 실패: {response.status_code}, 응답: {response.text}")
         return {"status": "failed", "error": response.text}
 
+
+def send_slack_alert(log_data):
+    """Slack Webhook으로 오류 알림 즉시 전송 (단일 로그 / 묶음 로그 모두 처리)"""
+    if log_data.get("events"):
+        add_events(to_events(log_data))
+        return flush_digest()
+    return post_to_slack(format_alert(log_data))
+
+
+def flush_digest():
+    """집계 중인 알림을 다이제스트 하나로 전송"""
+    groups = take_digest()
+    if not groups:
+        return {"status": "nothing_to_flush"}
+    result = post_to_slack(format_digest(groups))
+    if result["status"] != "success":
+        # 전송 실패 시 다음 호출에서 다시 보내도록 되돌려 둠
+        add_events(groups)
+    return result
+
+
 def lambda_handler(event, context):
-    """Step Function에서 오류 로그를 받아 Slack 알림 전송"""
+    """
+    Step Function / 각 Lambda에서 오류 로그를 받아 Slack 알림 전송.
+    ALERT_WINDOW_SECONDS > 0이면 윈도우 동안 모은 뒤 다이제스트로 전송하며,
+    EventBridge가 주기적으로 보내는 {"action": "flush"}가 윈도우가 지난 알림을 내보냅니다.
+    """
     try:
         print(f"🟢 수신된 이벤트: {json.dumps(event, ensure_ascii=False)}")
+        expire_pending()
 
-        # 오류 로그가 포함된 경우 Slack으로 전송
-        if "error" in event:
-            result = send_slack_alert(event)
-            return result
+        if event.get("action") == "flush":
+            if window_started is not None and time.time() - window_started >= ALERT_WINDOW_SECONDS:
+                return flush_digest()
+            return {"status": "window_open", "pending": sum(group["count"] for group in pending.values())}
+
+        # 오류 로그(단일 또는 묶음)가 포함된 경우 Slack으로 전송
+        if "error" in event or event.get("events"):
+            if ALERT_WINDOW_SECONDS <= 0:
+                return send_slack_alert(event)
+            add_events(to_events(event))
+            if time.time() - window_started >= ALERT_WINDOW_SECONDS:
+                return flush_digest()
+            return {"status": "aggregated", "pending": sum(group["count"] for group in pending.values())}
         else:
             print("⚠️ 오류 정보가 없는 이벤트입니다.")
             return {"status": "no_error_logged"}
@@ -54,3 +216,4 @@ def lambda_handler(event, context):
     except Exception as e:
         print(f"❌ Lambda 실행 중 오류 발생: {str(e)}")
         return {"status": "failed", "error": str(e)}
+
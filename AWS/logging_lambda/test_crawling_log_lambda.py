@@ -0,0 +1,93 @@
+"""
+crawling_log_lambda 집계 모드 테스트 (Slack 대신 로컬 HTTP 스텁으로 전송)
+
+    cd AWS/logging_lambda && python -m pytest -q
+"""
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+
+import crawling_log_lambda as log_lambda
+
+
+@pytest.fixture
+def slack_stub(monkeypatch):
+    """받은 메시지를 목록에 모으는 Slack Webhook 스텁"""
+    received = []
+
+    class SlackStub(BaseHTTPRequestHandler):
+        def do_POST(self):
+            received.append(json.loads(self.rfile.read(int(self.headers["Content-Length"]))))
+            self.send_response(200)
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, *args):
+            pass
+
+    server = HTTPServer(("127.0.0.1", 0), SlackStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(log_lambda, "SLACK_WEBHOOK_URL", f"http://127.0.0.1:{server.server_port}/webhook")
+    yield received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def window(monkeypatch):
+    monkeypatch.setattr(log_lambda, "ALERT_WINDOW_SECONDS", 60)
+    monkeypatch.setattr(log_lambda, "pending", {})
+    monkeypatch.setattr(log_lambda, "window_started", None)
+
+
+def error_event(source="clien_parse", stage="extract_content", url="https://www.clien.net/1"):
+    return {"status": "error", "source": source, "stage": stage, "url": url, "error": "본문이 존재하지만 파싱 실패"}
+
+
+def close_window(monkeypatch):
+    monkeypatch.setattr(log_lambda, "window_started", time.time() - log_lambda.ALERT_WINDOW_SECONDS)
+
+
+def test_events_are_sent_as_one_digest(slack_stub, monkeypatch):
+    for i in range(5):
+        assert log_lambda.lambda_handler(error_event(url=f"https://www.clien.net/{i}"), None)["status"] == "aggregated"
+    log_lambda.lambda_handler({"status": "error", "source": "fmkorea_parse", "total": 3, "events": [
+        {"stage": "extract_comments", "error": "댓글이 존재하지만 일부 파싱 실패", "count": 3, "urls": [],
+         "first_seen": log_lambda.now_kst(), "last_seen": log_lambda.now_kst()}]}, None)
+    assert log_lambda.lambda_handler({"action": "flush"}, None)["status"] == "window_open"
+    assert slack_stub == []
+
+    close_window(monkeypatch)
+    assert log_lambda.lambda_handler({"action": "flush"}, None)["status"] == "success"
+    assert len(slack_stub) == 1
+    assert "오류 8건 발생" in slack_stub[0]["text"]
+    assert log_lambda.pending == {}
+
+
+def test_failed_send_keeps_groups(monkeypatch):
+    # 닫힌 포트: 연결 실패가 handler의 예외 처리로 올라가지 않고, 꺼낸 그룹이 다시 보관됨
+    monkeypatch.setattr(log_lambda, "SLACK_WEBHOOK_URL", "http://127.0.0.1:1/webhook")
+    log_lambda.lambda_handler(error_event(), None)
+    close_window(monkeypatch)
+    assert log_lambda.lambda_handler({"action": "flush"}, None)["status"] == "failed"
+    assert [group["count"] for group in log_lambda.pending.values()] == [1]
+
+
+def test_pending_groups_are_capped(monkeypatch):
+    monkeypatch.setattr(log_lambda, "MAX_PENDING_GROUPS", 3)
+    for i in range(10):
+        log_lambda.lambda_handler(error_event(stage=f"stage_{i}"), None)
+    assert len(log_lambda.pending) == 4
+    assert log_lambda.pending[log_lambda.OVERFLOW_KEY]["count"] == 7
+
+
+def test_old_pending_groups_expire(monkeypatch):
+    log_lambda.lambda_handler(error_event(), None)
+    for group in log_lambda.pending.values():
+        group["held_since"] -= log_lambda.PENDING_MAX_AGE_SECONDS + 1
+    assert log_lambda.lambda_handler({"action": "flush"}, None)["status"] == "window_open"
+    assert log_lambda.pending == {}
+    assert log_lambda.window_started is None
@@ -1,131 +1,118 @@
-import json
 import boto3
-import pandas as pd
 import io
-import requests
 import os
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pyarrow as pa
+import pyarrow.parquet as pq
+from log_buffer import ErrorLogBuffer
+from schema import COMMENT_SCHEMA, CONTENT_SCHEMA, conform_table
 
 # AWS 클라이언트 설정
 s3 = boto3.client("s3")
-lambda_client = boto3.client("lambda")
+error_log = ErrorLogBuffer("merge_lambda")
 
 # 환경 변수
 BUCKET_NAME = os.getenv("BUCKET_NAME", "hmg5th-4-bucket")
 RAW_DATA_PREFIX = "raw_data/"
 MERGED_CONTENT_PREFIX = "merge_data/contents/"
 MERGED_COMMENT_PREFIX = "merge_data/comments/"
-LOGGING_LAMBDA_ARN = os.getenv("LOGGING_LAMBDA_ARN", "arn:aws:lambda:ap-northeast-2:473551908409:function:crawling_log_lambda")
-SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL")  # 환경 변수에서 Slack Webhook URL 가져오기
+
+# 병합 대상 사이트와 동시 다운로드 수
+SITES = ("fmkorea", "dcinside", "clien", "bobae")
+MERGE_WORKERS = int(os.getenv("MERGE_WORKERS", "8"))
 
 def list_s3_files(prefix):
-    """주어진 prefix로 S3에서 파일 목록 가져오기"""
+    """주어진 prefix로 S3에서 파일 목록 가져오기 (1000개 초과 시 페이지 단위로 모두 조회)"""
     try:
-        response = s3.list_objects_v2(Bucket=BUCKET_NAME, Prefix=prefix)
-        return [obj["Key"] for obj in response.get("Contents", [])]
+        paginator = s3.get_paginator("list_objects_v2")
+        return [obj["Key"] for page in paginator.paginate(Bucket=BUCKET_NAME, Prefix=prefix)
+                for obj in page.get("Contents", [])]
     except Exception as e:
         log_error("list_s3_files", f"S3 파일 목록 조회 실패: {str(e)}")
         return []
 
-def load_csv_from_s3(file_key):
-    """S3에서 CSV 파일을 불러와 DataFrame으로 변환"""
+def list_site_files(today_date):
+    """사이트별 prefix를 한 번씩만 조회해 오늘 날짜의 (본문 parquet 목록, 댓글 parquet 목록) 반환"""
+    content_files, comment_files = [], []
+    for site in SITES:
+        for key in list_s3_files(f"{RAW_DATA_PREFIX}{site}/{today_date}-"):
+            if key.endswith("-content.parquet"):
+                content_files.append(key)
+            elif key.endswith("-comment.parquet"):
+                comment_files.append(key)
+    return content_files, comment_files
+
+def load_parquet_from_s3(file_key):
+    """S3에서 Parquet 파일을 불러와 Arrow Table로 변환"""
     try:
         response = s3.get_object(Bucket=BUCKET_NAME, Key=file_key)
-        return pd.read_csv(io.BytesIO(response["Body"].read()), encoding="utf-8-sig")
+        return pq.read_table(io.BytesIO(response["Body"].read()))
     except Exception as e:
-        log_error("load_csv_from_s3", f"S3 CSV 로드 실패 ({file_key}): {str(e)}")
+        log_error("load_parquet_from_s3", f"S3 Parquet 로드 실패 ({file_key}): {str(e)}")
         return None
 
-def upload_csv_to_s3(df, file_key):
-    """병합된 DataFrame을 S3에 CSV로 저장"""
-    try:
-        csv_buffer = io.StringIO()
-        df.to_csv(csv_buffer, index=False, encoding="utf-8-sig")
-        s3.put_object(Bucket=BUCKET_NAME, Key=file_key, Body=csv_buffer.getvalue().encode("utf-8-sig"), ContentType="text/csv; charset=utf-8")
-        print(f"✅ 병합 데이터 저장 완료: {file_key}")
-    except Exception as e:
-        log_error("upload_csv_to_s3", f"병합 데이터 S3 업로드 실패 ({file_key}): {str(e)}")
-
-
-def upload_parquet_to_s3(df, file_key):
-    """병합된 DataFrame을 S3에 Parquet 파일로 저장"""
+def upload_parquet_to_s3(table, file_key):
+    """병합된 Table을 S3에 Parquet 파일로 저장"""
     try:
         buffer = io.BytesIO()
-        df.to_parquet(buffer, index=False)
+        pq.write_table(table, buffer)
         s3.put_object(Bucket=BUCKET_NAME, Key=file_key, Body=buffer.getvalue(), ContentType="application/octet-stream")
-        print(f"✅ 병합 데이터 저장 완료: {file_key}")
+        print(f"✅ 병합 데이터 저장 완료: {file_key} ({table.num_rows}건)")
     except Exception as e:
         log_error("upload_parquet_to_s3", f"병합 데이터 S3 업로드 실패 ({file_key}): {str(e)}")
 
 
 
-def merge_files(file_keys):
-    """S3에서 파일을 불러와 병합"""
-    dataframes = [load_csv_from_s3(file_key) for file_key in file_keys if load_csv_from_s3(file_key) is not None]
-    
-    if not dataframes:
+def merge_files(file_keys, schema):
+    """S3에서 파일을 스레드 풀로 동시에 불러와 공통 스키마의 Arrow Table로 병합 (각 파일은 한 번만 읽음)"""
+    with ThreadPoolExecutor(max_workers=MERGE_WORKERS) as executor:
+        tables = [table for table in executor.map(load_parquet_from_s3, file_keys) if table is not None]
+
+    if not tables:
         print("⚠️ 병합할 데이터 없음")
         return None
 
-    return pd.concat(dataframes, ignore_index=True)
+    # parse Lambda가 공통 스키마로 기록하므로 conform_table은 보통 변환 없이 그대로 반환하고(이전 형식 파일만 변환),
+    # 스키마가 같은 테이블의 concat_tables는 청크만 이어 붙이므로 데이터 복사가 없음
+    return pa.concat_tables([conform_table(table, schema) for table in tables])
 
 def log_error(stage, error_message):
-    """Lambda로 에러 로깅 전송"""
-    log_payload = {
-        "status": "error",
-        "source": "merge_lambda",
-        "stage": stage,
-        "error": error_message,
-        "timestamp": datetime.utcnow().isoformat()
-    }
-    try:
-        lambda_client.invoke(
-            FunctionName=LOGGING_LAMBDA_ARN,
-            InvocationType="Event",
-            Payload=json.dumps(log_payload)
-        )
-        print(f"📌 오류 기록: {log_payload}")
-    except Exception as e:
-        print(f"❌ 로그 람다 호출 실패: {str(e)}")
+    """오류를 버퍼에 모아 두고 handler 종료 시 한 번에 전송"""
+    error_log.log(stage, None, error_message)
 
 
+@error_log.flush_after
 def lambda_handler(event, context):
     """S3에서 오늘 날짜의 본문 & 댓글 데이터를 가져와 병합 후 저장"""
     
     today_date = datetime.utcnow().strftime("%Y-%m-%d")
     #today_date = (datetime.utcnow() - timedelta(days=1)).strftime("%Y-%m-%d")
 
-    # 1️⃣ 오늘 날짜의 content.csv & comment.csv 파일 목록 가져오기
-    content_files = list_s3_files(f"{RAW_DATA_PREFIX}fmkorea/{today_date}-content.csv") + \
-                    list_s3_files(f"{RAW_DATA_PREFIX}dcinside/{today_date}-content.csv") + \
-                    list_s3_files(f"{RAW_DATA_PREFIX}clien/{today_date}-content.csv") + \
-                    list_s3_files(f"{RAW_DATA_PREFIX}bobae/{today_date}-content.csv")
-
-    comment_files = list_s3_files(f"{RAW_DATA_PREFIX}fmkorea/{today_date}-comment.csv") + \
-                    list_s3_files(f"{RAW_DATA_PREFIX}dcinside/{today_date}-comment.csv") + \
-                    list_s3_files(f"{RAW_DATA_PREFIX}clien/{today_date}-comment.csv") + \
-                    list_s3_files(f"{RAW_DATA_PREFIX}bobae/{today_date}-comment.csv")
+    # 1️⃣ 사이트별 prefix를 한 번씩 조회해 오늘 날짜의 content / comment parquet 목록 가져오기
+    content_files, comment_files = list_site_files(today_date)
+    merged_content_key = merged_comment_key = None
 
     # 2️⃣ 본문 데이터 병합
-    merged_content_df = merge_files(content_files)
-    if merged_content_df is not None:
+    merged_content = merge_files(content_files, CONTENT_SCHEMA)
+    if merged_content is not None:
         merged_content_key = f"{MERGED_CONTENT_PREFIX}{today_date}.parquet"
-        upload_parquet_to_s3(merged_content_df, merged_content_key)
+        upload_parquet_to_s3(merged_content, merged_content_key)
     else:
         log_error("lambda_handler", "본문 데이터 없음: content_files 비어 있음")
 
 
     # 3️⃣ 댓글 데이터 병합
-    merged_comment_df = merge_files(comment_files)
-    if merged_comment_df is not None:
+    merged_comment = merge_files(comment_files, COMMENT_SCHEMA)
+    if merged_comment is not None:
         merged_comment_key = f"{MERGED_COMMENT_PREFIX}{today_date}.parquet"
-        upload_parquet_to_s3(merged_comment_df, merged_comment_key)
+        upload_parquet_to_s3(merged_comment, merged_comment_key)
     else:
         log_error("lambda_handler", "댓글 데이터 없음: comment_files 비어 있음")
 
 
     # 4️⃣ 병합할 데이터가 없으면 Step Function에 예외 전달 및 Slack 알림
-    if merged_content_df is None and merged_comment_df is None:
+    if merged_content is None and merged_comment is None:
         error_message = "병합할 데이터가 없어 Step Function에서 병합 실패로 처리."
         log_error("lambda_handler", error_message)
         raise Exception("NoDataToMergeException: 병합할 데이터 없음.")
@@ -0,0 +1,106 @@
+"""
+파서 백엔드(bs4 / lxml / selectolax) 벤치마크.
+fixtures/{site}/*.html 각 문서를 사이트 명세(SiteParser)로 파싱하는 시간을 비교하며,
+bs4 결과와 값이 다른 필드(본문 컬럼 + 댓글 목록) 수도 함께 출력합니다.
+기본 입력은 저장소에 포함된 사이트별 fixture(수집 원본 형태로 줄인 문서)이므로 S3 접근 없이 실행됩니다.
+
+    # 벤치마크 실행 (기본: 이 파일 옆의 fixtures/)
+    python benchmark_backends.py --repeat 5
+    # S3에 저장된 수집 원본에서 사이트별 fixture를 기록해 실제 문서로 측정
+    python benchmark_backends.py --fixtures /tmp/fixtures --record --date 2025-02-20 --samples 30
+"""
+import argparse
+import os
+import time
+import boto3
+from html_backend import BACKENDS, get_backend
+from parse_engine import CONTENT_COLUMNS, SiteParser
+from raw_reader import open_raw_html
+from site_specs import SITE_SPECS
+
+BUCKET_NAME = "hmg5th-4-bucket"
+# 저장소에 포함된 fixture (실행 위치와 무관)
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def record_fixtures(fixtures_dir, day, samples):
+    """raw_html/{site}/{day}/ 샤드(또는 기존 JSON)에서 사이트별로 samples개의 HTML을 fixture로 저장"""
+    s3 = boto3.client("s3")
+    for site in SITE_SPECS:
+        site_dir = os.path.join(fixtures_dir, site)
+        os.makedirs(site_dir, exist_ok=True)
+        count = 0
+        for _, _, html in open_raw_html(s3, BUCKET_NAME, f"raw_html/{site}/", day):
+            with open(os.path.join(site_dir, f"{count:03d}.html"), "w", encoding="utf-8") as f:
+                f.write(html)
+            count += 1
+            if count >= samples:
+                break
+        print(f"✅ {site}: fixture {count}개 저장 → {site_dir}")
+
+
+def load_fixtures(fixtures_dir, site):
+    site_dir = os.path.join(fixtures_dir, site)
+    if not os.path.isdir(site_dir):
+        return []
+    documents = []
+    for name in sorted(os.listdir(site_dir)):
+        if name.endswith(".html"):
+            with open(os.path.join(site_dir, name), encoding="utf-8") as f:
+                documents.append(f.read())
+    return documents
+
+
+def run_backend(parser, documents, repeat):
+    """문서당 평균 처리 시간(ms)과 마지막 반복의 (본문 행, 댓글 행 목록) 결과를 반환"""
+    results = []
+    started = time.perf_counter()
+    for _ in range(repeat):
+        results = [parser.parse_post(f"fixture-{i}", "benchmark", html) for i, html in enumerate(documents)]
+    elapsed = time.perf_counter() - started
+    return elapsed * 1000 / (repeat * len(documents)), results
+
+
+def count_diff(expected, actual):
+    """본문 컬럼별 / 댓글 목록의 불일치 수"""
+    diff = 0
+    for (expected_row, expected_comments), (actual_row, actual_comments) in zip(expected, actual):
+        if expected_row is None or actual_row is None:
+            diff += expected_row is not actual_row
+            continue
+        diff += sum(1 for column in CONTENT_COLUMNS if expected_row[column] != actual_row[column])
+        diff += expected_comments != actual_comments
+    return diff
+
+
+def main():
+    parser = argparse.ArgumentParser(description="파서 백엔드 벤치마크")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="{site}/*.html 디렉터리 (기본: 저장소의 fixtures/)")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="비교할 백엔드 (쉼표 구분)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--record", action="store_true", help="S3 수집 원본에서 fixture를 먼저 저장")
+    parser.add_argument("--date", help="--record에 사용할 날짜 (yyyy-mm-dd)")
+    parser.add_argument("--samples", type=int, default=30, help="--record 시 사이트별 문서 수")
+    args = parser.parse_args()
+
+    if args.record:
+        record_fixtures(args.fixtures, args.date or time.strftime("%Y-%m-%d"), args.samples)
+
+    backends = [get_backend(name) for name in args.backends.split(",")]
+    print(f"{'site':<10}{'backend':<12}{'docs':>6}{'ms/doc':>10}{'speedup':>9}{'diff fields':>13}")
+    for site in SITE_SPECS:
+        documents = load_fixtures(args.fixtures, site)
+        if not documents:
+            print(f"{site:<10}fixture 없음")
+            continue
+        baseline_ms, baseline = None, None
+        for dom in backends:
+            ms, results = run_backend(SiteParser(site, dom=dom), documents, args.repeat)
+            if baseline is None:
+                baseline_ms, baseline = ms, results
+            diff = count_diff(baseline, results)
+            print(f"{site:<10}{dom.name:<12}{len(documents):>6}{ms:>10.2f}{baseline_ms / ms:>8.1f}x{diff:>13}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+import os
+
+# bs4(html.parser) / lxml / selectolax 중 선택. 기본값은 기존과 같은 결과를 내는 bs4
+PARSE_BACKEND = os.getenv("PARSE_BACKEND", "bs4")
+
+# bs4의 get_text와 같이 script / style 안의 텍스트는 본문에서 제외
+SKIP_TEXT_PARENTS = ("script", "style", "template")
+
+
+class Bs4Backend:
+    """BeautifulSoup + html.parser (기존 파서와 동일한 동작)"""
+
+    name = "bs4"
+
+    def __init__(self):
+        from bs4 import BeautifulSoup
+        self.soup = BeautifulSoup
+
+    def parse(self, html):
+        return self.soup(html, "html.parser")
+
+    def compile(self, css):
+        """soupsieve가 컴파일한 선택자를 내부적으로 캐시하므로 별도 컴파일 없음"""
+        return css
+
+    def select(self, node, css):
+        return node.select(css)
+
+    def select_one(self, node, css):
+        return node.select_one(css)
+
+    def text(self, node, separator=""):
+        return node.get_text(separator=separator, strip=True)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+class LxmlBackend:
+    """lxml.html + cssselect. CSS 선택자는 XPath로 한 번만 컴파일해 재사용"""
+
+    name = "lxml"
+
+    def __init__(self):
+        import lxml.html
+        from lxml import etree
+        from lxml.cssselect import CSSSelector
+        self.document_fromstring = lxml.html.document_fromstring
+        self.css_selector = CSSSelector
+        self.text_xpath = etree.XPath(
+            ".//text()[not(" + " or ".join(f"parent::{tag}" for tag in SKIP_TEXT_PARENTS) + ")]"
+        )
+        self.compiled = {}
+
+    def parse(self, html):
+        return self.document_fromstring(html or "<html></html>")
+
+    def compile(self, css):
+        """CSS 선택자를 XPath로 컴파일해 캐시"""
+        selector = self.compiled.get(css)
+        if selector is None:
+            selector = self.compiled[css] = self.css_selector(css)
+        return selector
+
+    def select(self, node, css):
+        return self.compile(css)(node)
+
+    def select_one(self, node, css):
+        matches = self.compile(css)(node)
+        return matches[0] if matches else None
+
+    def text(self, node, separator=""):
+        return separator.join(part for part in (text.strip() for text in self.text_xpath(node)) if part)
+
+    def attr(self, node, name):
+        return node.get(name)
+
+
+class SelectolaxBackend:
+    """selectolax(lexbor). 텍스트는 bs4의 get_text(strip=True)와 같은 규칙으로 직접 이어 붙임"""
+
+    name = "selectolax"
+
+    def __init__(self):
+        from selectolax.lexbor import LexborHTMLParser
+        self.parser = LexborHTMLParser
+
+    def parse(self, html):
+        return self.parser(html)
+
+    def compile(self, css):
+        """selectolax는 선택자 컴파일 API가 없어 문자열 그대로 사용"""
+        return css
+
+    def select(self, node, css):
+        return node.css(css)
+
+    def select_one(self, node, css):
+        return node.css_first(css)
+
+    def text(self, node, separator=""):
+        parts = []
+        for child in node.traverse(include_text=True):
+            if child.tag == "-text" and child.parent.tag not in SKIP_TEXT_PARENTS:
+                part = child.text_content.strip()
+                if part:
+                    parts.append(part)
+        return separator.join(parts)
+
+    def attr(self, node, name):
+        return node.attributes.get(name)
+
+
+BACKENDS = {backend.name: backend for backend in (Bs4Backend, LxmlBackend, SelectolaxBackend)}
+_instances = {}
+
+
+def get_backend(name=PARSE_BACKEND):
+    """이름에 해당하는 백엔드 인스턴스를 반환 (프로세스당 하나만 생성)"""
+    if name not in BACKENDS:
+        raise ValueError(f"지원하지 않는 파서 백엔드: {name} (가능한 값: {', '.join(BACKENDS)})")
+    if name not in _instances:
+        _instances[name] = BACKENDS[name]()
+    return _instances[name]
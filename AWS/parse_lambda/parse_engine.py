@@ -0,0 +1,236 @@
+import json
+import re
+from datetime import datetime
+import boto3
+from html_backend import get_backend
+from log_buffer import ErrorLogBuffer
+from parse_pool import BatchedParquetWriter, parse_parallel
+from raw_reader import open_raw_html
+from schema import COMMENT_SCHEMA, CONTENT_SCHEMA
+from site_specs import SITE_SPECS
+
+# 환경 변수
+BUCKET_NAME = "hmg5th-4-bucket"
+
+# 본문 parquet 컬럼 순서 (common/schema.py의 CONTENT_SCHEMA)
+CONTENT_COLUMNS = tuple(CONTENT_SCHEMA.names)
+
+
+class MissingField(Exception):
+    """required 필드를 찾지 못한 경우 (해당 게시글은 건너뜀)"""
+
+
+class CompiledField:
+    """필드 명세 하나를 정규식 컴파일 / 선택자 캐시까지 마친 형태"""
+
+    def __init__(self, name, options, dom):
+        self.name = name
+        self.css = options.get("css")
+        self.index = options.get("index")
+        self.attr = options.get("attr")
+        self.separator = options.get("separator", "")
+        self.extract = re.compile(options["extract"]) if "extract" in options else None
+        self.cleanup = re.compile(options["cleanup"]) if "cleanup" in options else None
+        self.date_format = options.get("date_format")
+        self.date_output = options.get("date_output")
+        self.default = options.get("value", options.get("default"))
+        self.if_empty = options.get("if_empty")
+        self.required = options.get("required", False)
+        if self.css:
+            dom.compile(self.css)
+
+    def missing(self, reason):
+        if self.required:
+            raise MissingField(f"{self.name} {reason}")
+        return self.default
+
+    def value(self, document):
+        if self.css is None:
+            return self.default
+        text = document.text(self.css, self.index, self.attr, self.separator)
+        if text is None:
+            return self.missing("정보를 찾을 수 없음")
+        if self.extract:
+            match = self.extract.search(text)
+            if match is None:
+                return self.missing("정보를 찾을 수 없음")
+            text = " ".join(match.groups()) if match.groups() else match.group()
+        if self.cleanup:
+            text = self.cleanup.sub("", text).strip()
+        if self.date_format:
+            if not text:
+                return self.missing("정보를 찾을 수 없음")
+            try:
+                parsed = datetime.strptime(text, self.date_format)
+            except ValueError:
+                raise MissingField(f"날짜 변환 실패: {text}")
+            return parsed.strftime(self.date_output) if self.date_output else parsed
+        if not text and self.if_empty is not None:
+            return self.if_empty
+        return text
+
+
+class Document:
+    """게시글 하나의 트리와 선택자 / 텍스트 조회 결과 캐시 (같은 선택자를 쓰는 필드끼리 공유)"""
+
+    def __init__(self, dom, root):
+        self.dom = dom
+        self.root = root
+        self.nodes = {}
+        self.texts = {}
+
+    def node(self, css, index=None):
+        key = (css, index)
+        if key not in self.nodes:
+            if index is None:
+                self.nodes[key] = self.dom.select_one(self.root, css)
+            else:
+                matches = self.dom.select(self.root, css)
+                self.nodes[key] = matches[index] if len(matches) > index else None
+        return self.nodes[key]
+
+    def text(self, css, index=None, attr=None, separator=""):
+        """요소의 텍스트(attr이 있으면 속성값), 요소가 없으면 None"""
+        key = (css, index, attr, separator)
+        if key not in self.texts:
+            node = self.node(css, index)
+            if node is None:
+                self.texts[key] = None
+            elif attr:
+                self.texts[key] = (self.dom.attr(node, attr) or "").strip()
+            else:
+                self.texts[key] = self.dom.text(node, separator)
+        return self.texts[key]
+
+
+class SiteParser:
+    """
+    사이트 명세(site_specs.SITE_SPECS)를 콜드 스타트 때 한 번 컴파일해 모든 게시글에 재사용하는 파서.
+    사이트를 추가할 때는 명세만 추가하면 됩니다.
+    """
+
+    def __init__(self, site, spec=None, dom=None, log_error=None):
+        spec = spec or SITE_SPECS[site]
+        self.site = site
+        self.dom = dom or get_backend()
+        self.fields = [CompiledField(name, options, self.dom) for name, options in spec["fields"].items()]
+        self.content_field = next(field for field in self.fields if field.name == "content")
+        self.comment_css = spec["comments"]["css"]
+        self.comment_text_css = spec["comments"].get("text_css")
+        for css in (self.comment_css, self.comment_text_css):
+            if css:
+                self.dom.compile(css)
+        self.comment_separator = spec["comments"].get("separator", "")
+        self.log_error = log_error or (lambda stage, url, error_message: None)
+
+    def parse_post(self, url, keyword, html):
+        """HTML을 한 번만 파싱해 같은 트리에서 (본문 행, 댓글 행 목록)을 추출. 실패 시 (None, [])"""
+        try:
+            document = Document(self.dom, self.dom.parse(html))
+            row = {"site": self.site, "model": keyword, "url": url}
+            for field in self.fields:
+                row[field.name] = field.value(document)
+        except MissingField as e:
+            self.log_error("extract_content", url, str(e))
+            print(f"❌ {e}: {url}")
+            return None, []
+        except Exception as e:
+            self.log_error("extract_content", url, str(e))
+            return None, []
+
+        # 본문이 있는데 파싱 실패한 경우 로그 전송
+        content = self.content_field
+        if document.node(content.css, content.index) is not None and \
+                not document.text(content.css, content.index, content.attr, content.separator):
+            self.log_error("extract_content", url, "본문이 존재하지만 파싱 실패")
+
+        comments = self.extract_comments(document, url, row["title"])
+        row["comments_count"] = len(comments)
+        return {column: row[column] for column in CONTENT_COLUMNS}, comments
+
+    def extract_comments(self, document, url, title):
+        comments = []
+        failed_parsing = False
+        try:
+            for node in self.dom.select(document.root, self.comment_css):
+                if self.comment_text_css:
+                    node = self.dom.select_one(node, self.comment_text_css)
+                comment_text = self.dom.text(node, self.comment_separator) if node is not None else ""
+                if comment_text:
+                    comments.append({"url": url, "title": title, "comment": comment_text})
+                else:
+                    failed_parsing = True
+            # 파싱 실패한 댓글이 하나라도 있으면 게시글당 한 번만 로그 전송
+            if failed_parsing:
+                self.log_error("extract_comments", url, "댓글이 존재하지만 일부 파싱 실패")
+        except Exception as e:
+            self.log_error("extract_comments", url, str(e))
+        return comments
+
+
+def make_handler(site):
+    """사이트의 SiteParser를 만들고(콜드 스타트 1회) 해당 사이트의 lambda_handler를 반환"""
+    s3 = boto3.client("s3")
+    raw_html_prefix = f"raw_html/{site}/"
+    processed_data_prefix = f"raw_data/{site}/"
+
+    # 오류는 프로세스별 버퍼에 모아 두고, 워커 프로세스 종료 시 / handler 종료 시 한 번에 전송
+    error_log = ErrorLogBuffer(f"{site}_parse")
+    log_error = error_log.log
+    parser = SiteParser(site, log_error=log_error)
+
+    @error_log.flush_after
+    def lambda_handler(event, context):
+        """S3에서 HTML 샤드를 불러와 파싱 후 parquet로 저장"""
+        today_date = datetime.utcnow().strftime('%Y-%m-%d')
+        s3_key = f"{raw_html_prefix}{today_date}/"
+
+        try:
+            records = open_raw_html(s3, BUCKET_NAME, raw_html_prefix, today_date)
+        except s3.exceptions.NoSuchKey:
+            error_msg = f"파일을 찾을 수 없음: {s3_key}"
+            print(f"❌ {error_msg}")
+            log_error("load_html", s3_key, error_msg)
+            return {"status": "NoSuchKey", "key": s3_key}
+        except json.JSONDecodeError as e:
+            error_msg = f"JSON 디코딩 실패: {str(e)}"
+            print(f"❌ {error_msg}")
+            log_error("load_html", s3_key, error_msg)
+            return {"status": "JSONDecodeError", "error": str(e)}
+        except Exception as e:
+            error_msg = f"S3에서 HTML 데이터 불러오기 실패: {str(e)}"
+            print(f"❌ {error_msg}")
+            log_error("load_html", s3_key, error_msg)
+            return {"status": "Failed to load HTML data", "error": str(e)}
+
+        # 숫자 / 시간 컬럼은 공통 스키마 타입(int64, timestamp[s])으로 변환해 기록
+        content_writer = BatchedParquetWriter(s3, BUCKET_NAME, f"{processed_data_prefix}{today_date}-content.parquet",
+                                              schema=CONTENT_SCHEMA)
+        comment_writer = BatchedParquetWriter(s3, BUCKET_NAME, f"{processed_data_prefix}{today_date}-comment.parquet",
+                                              schema=COMMENT_SCHEMA)
+
+        # 게시글을 워커 프로세스에서 파싱하고, 결과 행은 배치 단위로 parquet에 기록
+        for content, comments in parse_parallel(records, parser.parse_post, on_worker_exit=error_log.flush):
+            if content:
+                content_writer.write([content])
+                comment_writer.write(comments)
+
+        # 본문 데이터를 parquet로 저장
+        content_file_key = content_writer.close()
+        if content_file_key:
+            print(f"✅ 본문 데이터 저장 완료: {content_file_key} ({content_writer.rows}건)")
+
+        # 댓글 데이터를 parquet로 저장
+        comment_file_key = comment_writer.close()
+        if comment_file_key:
+            print(f"✅ 댓글 데이터 저장 완료: {comment_file_key} ({comment_writer.rows}건)")
+        else:
+            print(f"ℹ️ 저장할 댓글 데이터 없음: {today_date}")
+
+        return {
+            "status": "Processing completed",
+            "content_file": content_file_key if content_file_key else "No content data",
+            "comment_file": comment_file_key if comment_file_key else "No comment data"
+        }
+
+    return lambda_handler
@@ -0,0 +1,136 @@
+import os
+import tempfile
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import wait
+import pyarrow as pa
+import pyarrow.parquet as pq
+from schema import rows_to_table
+
+# Lambda에는 /dev/shm이 없어 multiprocessing.Pool / Queue를 쓸 수 없으므로 Process + Pipe로 워커를 구성
+PARSE_WORKERS = int(os.getenv("PARSE_WORKERS", "0")) or os.cpu_count() or 1
+BATCH_ROWS = int(os.getenv("PARSE_BATCH_ROWS", "500"))
+
+
+def _worker(conn, parse_record, on_exit):
+    """(url, keyword, html)을 하나씩 받아 parse_record 결과를 돌려보냄. None을 받으면 on_exit 호출 후 종료"""
+    try:
+        while True:
+            record = conn.recv()
+            if record is None:
+                break
+            conn.send(parse_record(*record))
+    finally:
+        if on_exit:
+            on_exit()
+        conn.close()
+
+
+def parse_parallel(records, parse_record, workers=PARSE_WORKERS, on_worker_exit=None):
+    """
+    records를 vCPU 수만큼의 워커 프로세스에 나눠 파싱하고 (본문 행, 댓글 행 목록)을 순서 무관하게 yield.
+    워커마다 처리 중인 게시글은 하나뿐이라, 메모리에는 워커 수만큼의 HTML만 올라갑니다.
+    on_worker_exit는 워커 프로세스가 끝나기 직전에 호출됩니다 (워커에서 모은 오류 로그 전송 등).
+    """
+    if workers <= 1:
+        for record in records:
+            yield parse_record(*record)
+        return
+
+    processes, idle = [], []
+    for _ in range(workers):
+        parent_conn, child_conn = Pipe()
+        process = Process(target=_worker, args=(child_conn, parse_record, on_worker_exit))
+        process.start()
+        child_conn.close()
+        processes.append(process)
+        idle.append(parent_conn)
+
+    busy = set()
+    records = iter(records)
+    exhausted = False
+    try:
+        while True:
+            # 쉬고 있는 워커에게 다음 게시글을 배정
+            while idle and not exhausted:
+                record = next(records, None)
+                if record is None:
+                    exhausted = True
+                    break
+                conn = idle.pop()
+                conn.send(record)
+                busy.add(conn)
+            if not busy:
+                break
+            for conn in wait(list(busy)):
+                try:
+                    result = conn.recv()
+                except EOFError:
+                    raise RuntimeError("파싱 워커가 비정상 종료됨")
+                busy.discard(conn)
+                idle.append(conn)
+                yield result
+    finally:
+        for conn in idle + list(busy):
+            try:
+                conn.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+        for process in processes:
+            process.join(timeout=5)
+            if process.is_alive():
+                process.terminate()
+
+
+class BatchedParquetWriter:
+    """
+    행(dict)을 batch_rows 단위로 모아 /tmp의 Parquet 파일에 row group으로 기록하고, close()에서 S3에 업로드.
+    schema(common/schema.py)가 주어지면 모든 배치를 그 스키마로 변환하고,
+    없으면 첫 배치에서 스키마를 정해 이후 배치를 같은 스키마로 변환합니다.
+    """
+
+    def __init__(self, s3, bucket, key, batch_rows=BATCH_ROWS, schema=None):
+        self.s3 = s3
+        self.bucket = bucket
+        self.key = key
+        self.batch_rows = batch_rows
+        self.schema = schema
+        self.path = os.path.join(tempfile.gettempdir(), os.path.basename(key))
+        self.pending = []
+        self.writer = None
+        self.rows = 0
+
+    def write(self, rows):
+        self.pending.extend(rows)
+        if len(self.pending) >= self.batch_rows:
+            self._flush()
+
+    def _flush(self):
+        if not self.pending:
+            return
+        if self.schema is not None:
+            table = rows_to_table(self.pending, self.schema)
+            if self.writer is None:
+                self.writer = pq.ParquetWriter(self.path, self.schema)
+        elif self.writer is None:
+            table = pa.Table.from_pylist(self.pending)
+            # 첫 배치에서 값이 모두 None인 컬럼은 문자열로 고정
+            schema = pa.schema([
+                field.with_type(pa.string()) if pa.types.is_null(field.type) else field for field in table.schema
+            ])
+            self.writer = pq.ParquetWriter(self.path, schema)
+            table = table.cast(schema)
+        else:
+            table = pa.Table.from_pylist(self.pending, schema=self.writer.schema)
+        self.writer.write_table(table)
+        self.rows += len(self.pending)
+        self.pending = []
+
+    def close(self):
+        """남은 행을 기록하고 업로드한 S3 key를 반환 (행이 없으면 None)"""
+        self._flush()
+        if self.writer is None:
+            return None
+        self.writer.close()
+        self.s3.upload_file(self.path, self.bucket, self.key, ExtraArgs={"ContentType": "application/octet-stream"})
+        os.remove(self.path)
+        return self.key
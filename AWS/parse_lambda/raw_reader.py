@@ -0,0 +1,75 @@
+import gzip
+import json
+
+MANIFEST_NAME = "manifest.json"
+
+
+def open_raw_html(s3, bucket, prefix, day):
+    """
+    수집 원본을 (url, keyword, html) iterator로 반환.
+    - raw_html/{site}/{date}/manifest.json이 있으면 샤드(.jsonl.gz)를 순서대로 스트리밍
+    - 없으면 이전 형식의 raw_html/{site}/{date}.json을 읽음
+    manifest / JSON을 찾지 못하거나 디코딩에 실패하면 호출 시점에 예외가 그대로 발생합니다.
+    """
+    try:
+        manifest = json.loads(s3.get_object(Bucket=bucket, Key=f"{prefix}{day}/{MANIFEST_NAME}")["Body"].read())
+    except s3.exceptions.NoSuchKey:
+        response = s3.get_object(Bucket=bucket, Key=f"{prefix}{day}.json")
+        html_data = json.loads(response["Body"].read().decode("utf-8-sig"))
+        return ((url, data["keyword"], data["html"]) for url, data in html_data.items())
+    print(f"🗂️ manifest 로드: {prefix}{day}/ (샤드 {len(manifest['shards'])}개)")
+    return iter_shards(s3, bucket, manifest["shards"])
+
+
+def iter_shards(s3, bucket, shards):
+    """
+    같은 URL이 여러 번 있으면 가장 나중 실행의 레코드만 사용.
+    한 실행 안에서는 rank(키워드 우선순위, 없으면 0)가 높은 레코드, rank가 같으면 가장 나중에 기록된 레코드를 사용합니다.
+    실행마다 샤드를 두 번 스트리밍(압축을 풀며 한 줄씩)하며, 첫 번째는 URL별로 사용할 줄 위치만 기록하고 두 번째에 그 줄만 반환합니다.
+    "urls"가 있는 항목은 다시 수집하지 않은 게시글의 이전 샤드(전날 실행 등)이며, 그중 urls의 게시글만 오늘 키워드로 사용합니다.
+    """
+    seen_urls = set()
+    for run in reversed(_group_runs(shards)):
+        chosen = {}
+        for position, record in _iter_records(s3, bucket, run):
+            url = record["url"]
+            if url in seen_urls:
+                continue
+            candidate = (record.get("rank", 0), position)
+            if url not in chosen or candidate > chosen[url]:
+                chosen[url] = candidate
+        referred = {url for shard in run for url in shard.get("urls", ())}
+        missing = referred - seen_urls - chosen.keys()
+        if missing:
+            print(f"⚠️ 이전 샤드에서 찾지 못한 게시글 {len(missing)}건 (예: {next(iter(missing))})")
+        for position, record in _iter_records(s3, bucket, run):
+            choice = chosen.get(record["url"])
+            if choice is not None and choice[1] == position:
+                yield record["url"], record["keyword"], record["html"]
+        seen_urls.update(chosen)
+
+
+def _group_runs(shards):
+    """manifest 순서대로 같은 실행(run_id)의 연속된 샤드를 묶음"""
+    runs = []
+    for shard in shards:
+        if runs and runs[-1][0].get("run_id") == shard.get("run_id"):
+            runs[-1].append(shard)
+        else:
+            runs.append([shard])
+    return runs
+
+
+def _iter_records(s3, bucket, run):
+    """실행 하나의 샤드들을 순서대로 읽어 ((샤드 번호, 줄 번호), 레코드) 반환"""
+    for shard_index, shard in enumerate(run):
+        urls = shard.get("urls")
+        body = s3.get_object(Bucket=bucket, Key=shard["key"])["Body"]
+        with gzip.GzipFile(fileobj=body, mode="rb") as stream:
+            for line_index, line in enumerate(stream):
+                record = json.loads(line)
+                if urls is not None:
+                    if record["url"] not in urls:
+                        continue
+                    record["keyword"] = urls[record["url"]]
+                yield (shard_index, line_index), record
@@ -0,0 +1,70 @@
+"""
+사이트별 파싱 명세. parse_engine이 콜드 스타트 때 한 번 컴파일해 모든 게시글에 재사용합니다.
+
+필드 옵션
+- css: 요소 선택자 (모든 파서 백엔드가 공유), index: 여러 요소 중 n번째 사용
+- attr: 텍스트 대신 속성값 사용, separator: 텍스트 조각 사이 구분자 (기본 "")
+- extract: 정규식으로 값 추출 (그룹이 여러 개면 공백으로 이어 붙임)
+- cleanup: 값에서 지울 패턴 (정규식)
+- date_format: strptime 형식 (datetime으로 변환), date_output이 있으면 해당 형식의 문자열로 변환
+  (parquet에는 common/schema.py의 timestamp[s]로 기록되므로 보통 date_output은 쓰지 않음)
+- default: 요소(또는 extract 결과)가 없을 때 값, if_empty: 값이 빈 문자열일 때 값
+- required: 값이 없으면 게시글 전체를 건너뜀
+- value: 선택자 없이 고정값
+"""
+
+SITE_SPECS = {
+    "bobae": {
+        "fields": {
+            "title": {"css": "dt strong", "cleanup": r"\[.*?\]", "default": "제목 없음"},
+            "author": {"css": "a.nickName", "default": "알 수 없음"},
+            # span.countGroup: "조회 1,234 | 추천 5 | 2025.02.20 (목) 10:00"
+            "datetime": {"css": "span.countGroup", "extract": r"(\d{4}\.\d{2}\.\d{2})\s*(?:\(.*?\))?\s*(\d{2}:\d{2})",
+                         "date_format": "%Y.%m.%d %H:%M", "required": True},
+            "views": {"css": "span.countGroup", "extract": r"조회\s*([\d,]+)", "cleanup": ",", "default": "0"},
+            "likes": {"css": "span.countGroup", "extract": r"추천\s*([\d,]+)", "cleanup": ",", "default": "0"},
+            "hates": {"value": "0"},  # 보배드림은 싫어요 없음
+            "content": {"css": "div.bodyCont", "separator": " ", "default": ""},
+        },
+        "comments": {"css": "div.commentlistbox dd[id^='small_cmt_']", "separator": " "},
+    },
+    "clien": {
+        "fields": {
+            "datetime": {"css": "span.view_count.date", "cleanup": r"수정일.*", "date_format": "%Y-%m-%d %H:%M:%S",
+                         "required": True},
+            "title": {"css": "h3.post_subject span:nth-of-type(2)", "default": "제목 없음", "if_empty": "N/A"},
+            "content": {"css": "div.post_article", "default": "", "if_empty": "N/A"},
+            "author": {"css": "span.nickname span", "default": "알 수 없음", "if_empty": "N/A"},
+            "views": {"css": "span.view_count strong", "cleanup": ",", "default": "0", "if_empty": "0"},
+            "likes": {"css": "a.symph_count strong", "cleanup": ",", "default": "0", "if_empty": "0"},
+            "hates": {"value": "0"},  # Clien은 싫어요 없음
+        },
+        "comments": {"css": "div.comment_view"},
+    },
+    "dcinside": {
+        "fields": {
+            "title": {"css": "span.title_subject", "default": "제목 없음"},
+            "content": {"css": "div.write_div", "separator": "\n", "default": ""},
+            "author": {"css": "div.gall_writer span.nickname", "default": "알 수 없음"},
+            "datetime": {"css": "span.gall_date", "attr": "title", "date_format": "%Y-%m-%d %H:%M:%S", "default": "N/A"},
+            # "조회 64" → "64"
+            "views": {"css": "span.gall_count", "cleanup": r"조회|,|\s", "default": "0"},
+            "likes": {"css": "p.up_num", "cleanup": ",", "default": "0"},
+            "hates": {"css": "p.down_num", "cleanup": ",", "default": "0"},
+        },
+        "comments": {"css": "ul.cmt_list li.ub-content", "text_css": "p.usertxt.ub-word"},
+    },
+    "fmkorea": {
+        "fields": {
+            "datetime": {"css": "span.date.m_no", "cleanup": r"수정일.*", "date_format": "%Y.%m.%d %H:%M",
+                         "required": True},
+            "title": {"css": "h1 span.np_18px_span", "default": "제목 없음"},
+            "content": {"css": ".xe_content", "default": ""},
+            "author": {"css": ".member_plate", "default": "알 수 없음"},
+            "views": {"css": ".btm_area .fr span b", "index": 0, "default": "0"},
+            "likes": {"css": ".btm_area .fr span b", "index": 1, "default": "0"},
+            "hates": {"value": "0"},  # 펨코는 싫어요 없음
+        },
+        "comments": {"css": "ul.fdb_lst_ul div.comment-content"},
+    },
+}
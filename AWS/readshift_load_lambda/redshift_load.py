@@ -41,7 +41,7 @@ def load_filtered_data_to_redshift(s3_path, start_time, end_time):
     'datetime' 컬럼을 기준으로 어제 자정부터 오늘 자정까지의 데이터만 실제 대상 테이블(my_table)에 추가합니다.
     
     가정:
-      - Parquet 파일에는 "datetime" 컬럼이 있으며, 형식은 'yyyy-mm-dd hh:mm:ss'입니다.
+      - Parquet 파일에는 "datetime" 컬럼이 있으며, timestamp 타입입니다 (common/schema.py).
     """
     conn = psycopg2.connect(
         dbname=REDSHIFT_DATABASE,
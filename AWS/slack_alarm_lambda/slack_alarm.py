@@ -12,6 +12,16 @@ SLACK_WEBHOOK_URL = os.getenv("SLACK_WEBHOOK_URL", "")
 # 화제도 임계값 (필요에 따라 조정)
 THRESHOLD = 15
 
+def is_alarm_file(key):
+    """
+    transformed_data/alarm/ 아래 최종 CSV 파일인지 확인.
+    Spark가 저장 중에 쓰는 경로(_temporary/, dynamic overwrite의 .spark-staging-*/ 등 '_' / '.'로 시작하는 경로)는 제외
+    (같은 파일이 스테이징 경로와 최종 경로에 한 번씩 올라와 알림이 두 번 가지 않도록)
+    """
+    if not (key.startswith("transformed_data/alarm/") and key.endswith(".csv")):
+        return False
+    return not any(part.startswith(("_", ".")) for part in key.split("/"))
+
 def lambda_handler(event, context):
     print("Received event:", json.dumps(event))
     s3_client = boto3.client('s3')
@@ -22,8 +32,8 @@ def lambda_handler(event, context):
         
         print(f"Processing file: {key} from bucket: {bucket}")
         
-        # transformed_data/alarm/ 폴더에 업로드된 CSV 파일만 처리
-        if not (key.startswith("transformed_data/alarm/") and key.endswith(".csv") and "_temporary" not in key):
+        # transformed_data/alarm/ 폴더에 업로드된 최종 CSV 파일만 처리
+        if not is_alarm_file(key):
             continue
         
         try: